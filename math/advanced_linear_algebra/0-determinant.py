@@ -3,38 +3,151 @@
 Module to calculate the determinant of a square matrix.
 
 This script defines a function that calculates the determinant of a matrix
-using recursion and Laplace expansion. It also validates that the matrix
-is square and checks input types.
+in O(n^3) by elimination: fraction-free Bareiss elimination when every entry
+is an integer, so the result stays an exact integer, and Gaussian elimination
+with partial pivoting otherwise: in exact fractions when every entry is an
+integer or a Fraction, in floating point when every entry is a real number,
+and in the entries' own arithmetic (e.g. complex) otherwise. It also
+validates that the matrix is square and checks input types.
+
+`batch_determinant` computes the determinants of a whole numpy stack of
+matrices at once with numpy.linalg.slogdet.
 """
 
+from fractions import Fraction
+import numbers
+import numpy as np
+
+
 def determinant(matrix):
     """Calculates the determinant of a square matrix."""
-    
+
     # Validate input type
     if not isinstance(matrix, list) or not all(isinstance(row, list) for row in matrix):
         raise TypeError("matrix must be a list of lists")
-    
+
     # Validate square matrix
     n = len(matrix)
     if any(len(row) != n for row in matrix):
         raise ValueError("matrix must be a square matrix")
-    
+
     # Base case: determinant of an empty matrix (0x0) is 1
     if n == 0:
         return 1
-    
+
     # Base case: determinant of a 1x1 matrix
     if n == 1:
         return matrix[0][0]
-    
+
     # Base case: determinant of a 2x2 matrix
     if n == 2:
         return matrix[0][0] * matrix[1][1] - matrix[0][1] * matrix[1][0]
-    
-    # Recursive case: Laplace expansion along the first row
-    det = 0
-    for col in range(n):
-        sub_matrix = [row[:col] + row[col + 1:] for row in matrix[1:]]
-        det += ((-1) ** col) * matrix[0][col] * determinant(sub_matrix)
+
+    if all(isinstance(x, int) for row in matrix for x in row):
+        return bareiss_determinant(matrix)
+    return gauss_determinant(matrix)
+
+
+def bareiss_determinant(matrix):
+    """
+    Calculates the exact determinant of an integer matrix with the
+    fraction-free Bareiss elimination: every division is exact, so all the
+    intermediate values stay integers.
+    """
+    n = len(matrix)
+    m = [row[:] for row in matrix]
+    sign = 1
+    prev = 1
+
+    for k in range(n - 1):
+        # Swap in a row with a non-zero pivot
+        if m[k][k] == 0:
+            for i in range(k + 1, n):
+                if m[i][k] != 0:
+                    m[k], m[i] = m[i], m[k]
+                    sign = -sign
+                    break
+            else:
+                return 0
+
+        pivot = m[k][k]
+        row_k = m[k]
+        for i in range(k + 1, n):
+            row_i = m[i]
+            factor = row_i[k]
+            for j in range(k + 1, n):
+                row_i[j] = (row_i[j] * pivot - factor * row_k[j]) // prev
+        prev = pivot
+
+    return sign * m[n - 1][n - 1]
+
+
+def gauss_determinant(matrix):
+    """
+    Calculates the determinant of a matrix as the product of the pivots of
+    Gaussian elimination with partial pivoting.
+    """
+    n = len(matrix)
+    m = _field(matrix)
+    det = m[0][0] * 0 + 1
+
+    for k in range(n):
+        # Partial pivoting: largest absolute value in the column
+        p = max(range(k, n), key=lambda i: abs(m[i][k]))
+        if m[p][k] == 0:
+            return det - det
+        if p != k:
+            m[k], m[p] = m[p], m[k]
+            det = -det
+
+        pivot = m[k][k]
+        det *= pivot
+        row_k = m[k]
+        for i in range(k + 1, n):
+            row_i = m[i]
+            factor = row_i[k] / pivot
+            if factor:
+                for j in range(k + 1, n):
+                    row_i[j] -= factor * row_k[j]
 
     return det
+
+
+def _field(matrix):
+    """
+    Copies matrix into exact fractions when every entry is an integer or a
+    Fraction, into floats when every entry is a real number, and as it is
+    otherwise.
+    """
+    entries = [x for row in matrix for x in row]
+    if all(isinstance(x, (int, Fraction)) for x in entries):
+        return [[Fraction(x) for x in row] for row in matrix]
+    if all(isinstance(x, numbers.Real) for x in entries):
+        return [[float(x) for x in row] for row in matrix]
+    return [row[:] for row in matrix]
+
+
+def batch_determinant(matrices, log=False):
+    """
+    Calculates the determinants of a stack of square matrices at once.
+
+    Args:
+        matrices (numpy.ndarray): Shape (batch, n, n) stack of matrices.
+        log (bool): If True, return the sign and the natural log of the
+            absolute value of each determinant instead, which neither
+            overflows nor underflows.
+
+    Returns:
+        numpy.ndarray: Shape (batch,) determinants, or a tuple of
+        (sign, logdet) arrays of shape (batch,) when log is True.
+    """
+    if not isinstance(matrices, np.ndarray) or matrices.ndim != 3:
+        raise TypeError(
+            "matrices must be a numpy.ndarray of shape (batch, n, n)")
+    if matrices.shape[1] != matrices.shape[2]:
+        raise ValueError("matrices must be square")
+
+    sign, logdet = np.linalg.slogdet(matrices)
+    if log:
+        return sign, logdet
+    return sign * np.exp(logdet)
@@ -4,54 +4,23 @@
 This module contains functions for matrix operations, including calculating the 
 determinant and minor matrix of a square matrix.
 
-The `determinant` function calculates the determinant of a square matrix using 
-recursion. The `minor` function calculates the minor matrix of a given square matrix.
+The `determinant` function calculates the determinant of a square matrix by
+elimination. The `minor` function calculates the minor matrix of a given square
+matrix from a single factorization (see 4-inverse.py), in O(n^3).
 
 Functions:
     - determinant(matrix): Returns the determinant of the matrix.
     - minor(matrix): Returns the minor matrix of the matrix.
 """
+_determinant = __import__('0-determinant').determinant
+_inverse = __import__('4-inverse')
 
 
 def determinant(matrix):
     """Calculates the determinant of a square matrix."""
-    if not isinstance(matrix, list) or not all(isinstance(row, list) for row in matrix):
-        raise TypeError("matrix must be a list of lists")
-
-    if any(len(row) != len(matrix) for row in matrix):
-        raise ValueError("matrix must be a square matrix")
-
-    if len(matrix) == 1:
-        return matrix[0][0]
-
-    if len(matrix) == 2:
-        return matrix[0][0] * matrix[1][1] - matrix[0][1] * matrix[1][0]
-
-    det = 0
-    for col in range(len(matrix)):
-        sub_matrix = [row[:col] + row[col+1:] for row in matrix[1:]]
-        det += ((-1) ** col) * matrix[0][col] * determinant(sub_matrix)
-
-    return det
+    return _determinant(matrix)
 
 
 def minor(matrix):
     """Calculates the minor matrix of a square matrix."""
-    if not isinstance(matrix, list) or not all(isinstance(row, list) for row in matrix):
-        raise TypeError("matrix must be a list of lists")
-
-    if len(matrix) == 0 or any(len(row) != len(matrix) for row in matrix):
-        raise ValueError("matrix must be a non-empty square matrix")
-
-    if len(matrix) == 1:
-        return [[1]]
-
-    minor_matrix = []
-    for i in range(len(matrix)):
-        minor_row = []
-        for j in range(len(matrix)):
-            sub_matrix = [row[:j] + row[j+1:] for row in (matrix[:i] + matrix[i+1:])]
-            minor_row.append(determinant(sub_matrix))
-        minor_matrix.append(minor_row)
-
-    return minor_matrix
+    return _inverse.minor(matrix)
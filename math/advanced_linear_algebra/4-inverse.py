@@ -3,39 +3,41 @@
 """
 Module to calculate matrix operations such as determinant, minor, cofactor, adjugate, and inverse.
 This module handles matrix inversion and related calculations for square matrices.
+
+All of them come from a single Gauss-Jordan factorization, so each costs
+O(n^3) instead of one recursive determinant per entry. Integer matrices
+are factorized exactly by fraction-free (Bareiss) Gauss-Jordan elimination,
+Fraction matrices exactly with fractions.Fraction, and any other matrix in
+floating point.
+
+`batch_inverse` inverts a whole numpy stack of matrices at once.
 """
 
+from fractions import Fraction
+import numpy as np
+
+
 def determinant(matrix):
     """Calculates the determinant of a matrix."""
-    if len(matrix) == 1:
-        return matrix[0][0]
-    if len(matrix) == 2:
-        return matrix[0][0] * matrix[1][1] - matrix[0][1] * matrix[1][0]
-    
-    det = 0
-    for i in range(len(matrix)):
-        minor_mat = [row[:i] + row[i+1:] for row in matrix[1:]]
-        det += ((-1) ** i) * matrix[0][i] * determinant(minor_mat)
-    return det
+    _validate(matrix)
+    return _integral(factorize(matrix)[0])
 
 
 def minor(matrix):
     """Calculates the minor matrix of a matrix."""
+    _validate(matrix)
+    adj = factorize(matrix)[2]
+    n = len(matrix)
     return [
-        [
-            determinant([row[:j] + row[j+1:] for i, row in enumerate(matrix) if i != k])
-            for j in range(len(matrix))
-        ]
-        for k in range(len(matrix))
+        [_integral((-1) ** (i + j) * adj[j][i]) for j in range(n)]
+        for i in range(n)
     ]
 
 
 def cofactor(matrix):
     """Calculates the cofactor matrix of a matrix."""
-    return [
-        [(-1) ** (i + j) * matrix[i][j] for j in range(len(matrix))]
-        for i in range(len(matrix))
-    ]
+    _validate(matrix)
+    return transpose(adjugate(matrix))
 
 
 def transpose(matrix):
@@ -48,22 +50,213 @@ def transpose(matrix):
 
 def adjugate(matrix):
     """Calculates the adjugate matrix of a matrix."""
-    return transpose(cofactor(minor(matrix)))
+    _validate(matrix)
+    adj = factorize(matrix)[2]
+    return [[_integral(x) for x in row] for row in adj]
 
 
 def inverse(matrix):
     """Calculates the inverse of a matrix."""
+    _validate(matrix)
+    return factorize(matrix)[1]
+
+
+def batch_inverse(matrices):
+    """
+    Calculates the inverses of a stack of square matrices at once.
+
+    The inverses of singular matrices, for which inverse returns None, are
+    filled with NaN.
+
+    Args:
+        matrices (numpy.ndarray): Shape (batch, n, n) stack of matrices.
+
+    Returns:
+        numpy.ndarray: Shape (batch, n, n) inverses.
+    """
+    if not isinstance(matrices, np.ndarray) or matrices.ndim != 3:
+        raise TypeError(
+            "matrices must be a numpy.ndarray of shape (batch, n, n)")
+    if matrices.shape[1] == 0 or matrices.shape[1] != matrices.shape[2]:
+        raise ValueError("matrices must be non-empty and square")
+
+    # np.linalg.inv fails for the whole stack on a single singular matrix
+    sign, _ = np.linalg.slogdet(matrices)
+    regular = sign != 0
+    inv = np.full(matrices.shape, np.nan)
+    if regular.all():
+        inv[...] = np.linalg.inv(matrices)
+    elif regular.any():
+        inv[regular] = np.linalg.inv(matrices[regular])
+    return inv
+
+
+def factorize(matrix):
+    """
+    Factorizes a square matrix once and derives from it its determinant,
+    inverse and adjugate.
+
+    Returns a tuple (det, inv, adj), with inv None for a singular matrix.
+    The adjugate is det * inv when the matrix is invertible; otherwise it
+    is zero when the rank is below n - 1, and v * u^T scaled by one cofactor
+    when the rank is n - 1, where v and u span the null spaces of the
+    matrix and of its transpose.
+    """
+    n = len(matrix)
+    if all(type(x) is int for row in matrix for x in row):
+        exact = _bareiss_jordan(matrix)
+        if exact is not None:
+            det, adj = exact
+            inv = [[Fraction(x, det) for x in row] for row in adj]
+            return Fraction(det), inv, [[Fraction(x) for x in row]
+                                        for row in adj]
+
+    a = _field(matrix)
+    zero = a[0][0] * 0
+    inv = [[zero + (i == j) for j in range(n)] for i in range(n)]
+    pivots, det = _gauss_jordan(a, inv)
+
+    if len(pivots) == n:
+        adj = [[det * x for x in row] for row in inv]
+        return det, inv, adj
+
+    adj = [[zero] * n for _ in range(n)]
+    if len(pivots) < n - 1:
+        return zero, None, adj
+
+    # rank n - 1: adj = alpha * v * u^T with A v = 0 and u^T A = 0
+    v = _null_vector(a, pivots)
+    at = _field(transpose(matrix))
+    v_t = _null_vector(at, _gauss_jordan(at, None)[0])
+    i = max(range(n), key=lambda k: abs(v[k]))
+    j = max(range(n), key=lambda k: abs(v_t[k]))
+    sub = [row[:i] + row[i + 1:] for k, row in enumerate(matrix) if k != j]
+    if n == 1:
+        c = 1
+    else:
+        c = _gauss_jordan(_field(sub), None)[1]
+    # adj[i][j] is the (j, i) cofactor
+    alpha = (-1) ** (i + j) * c / (v[i] * v_t[j])
+    adj = [[alpha * v[r] * v_t[s] for s in range(n)] for r in range(n)]
+    return zero, None, adj
+
+
+def _bareiss_jordan(matrix):
+    """
+    Runs fraction-free Gauss-Jordan elimination on [A | I] for an integer
+    matrix A: every division is exact, and it ends on [d * I | X] where
+    X = d * inv(P A) for the row permutation P.
+
+    Returns (det, adj) as integers, or None if the matrix is singular.
+    """
+    n = len(matrix)
+    m = [row[:] + [int(i == j) for j in range(n)]
+         for i, row in enumerate(matrix)]
+    sign = 1
+    prev = 1
+
+    for k in range(n):
+        p = next((i for i in range(k, n) if m[i][k] != 0), None)
+        if p is None:
+            return None
+        if p != k:
+            m[k], m[p] = m[p], m[k]
+            sign = -sign
+
+        pivot = m[k][k]
+        row_k = m[k]
+        for i in range(n):
+            if i == k:
+                continue
+            row_i = m[i]
+            factor = row_i[k]
+            m[i] = [(pivot * x - factor * y) // prev
+                    for x, y in zip(row_i, row_k)]
+        prev = pivot
+
+    # det(A) = sign * d and adj(A) = det(A) * inv(A) = sign * X
+    return sign * prev, [[sign * x for x in row[n:]] for row in m]
+
+
+def _gauss_jordan(a, aug):
+    """
+    Reduces a (in place) to reduced row echelon form with partial
+    pivoting, applying the same row operations to aug when given. Like
+    the determinant of 0-determinant, only an exact zero pivot makes a
+    column singular, so that badly scaled matrices stay invertible.
+
+    Returns the list of pivot columns and the determinant of a (zero when
+    a column has no pivot).
+    """
+    n_rows, n_cols = len(a), len(a[0])
+    det = a[0][0] * 0 + 1
+    pivots = []
+    r = 0
+    for col in range(n_cols):
+        if r == n_rows:
+            break
+        p = max(range(r, n_rows), key=lambda i: abs(a[i][col]))
+        if a[p][col] == 0:
+            det *= 0
+            continue
+        if p != r:
+            a[r], a[p] = a[p], a[r]
+            if aug is not None:
+                aug[r], aug[p] = aug[p], aug[r]
+            det = -det
+
+        pivot = a[r][col]
+        det *= pivot
+        a[r] = [x / pivot for x in a[r]]
+        if aug is not None:
+            aug[r] = [x / pivot for x in aug[r]]
+        for i in range(n_rows):
+            factor = a[i][col]
+            if i != r and factor:
+                a[i] = [x - factor * y for x, y in zip(a[i], a[r])]
+                if aug is not None:
+                    aug[i] = [x - factor * y for x, y in zip(aug[i], aug[r])]
+        pivots.append(col)
+        r += 1
+
+    return pivots, det
+
+
+def _null_vector(rref, pivots):
+    """
+    Returns a vector spanning the null space of a reduced row echelon
+    matrix with exactly one free column.
+    """
+    n = len(rref[0])
+    free = next(col for col in range(n) if col not in pivots)
+    zero = rref[0][0] * 0
+    v = [zero] * n
+    v[free] = zero + 1
+    for r, col in enumerate(pivots):
+        v[col] = -rref[r][free]
+    return v
+
+
+def _field(matrix):
+    """
+    Copies matrix into exact fractions when every entry is an integer or a
+    Fraction, into floats otherwise.
+    """
+    if all(isinstance(x, (int, Fraction)) for row in matrix for x in row):
+        return [[Fraction(x) for x in row] for row in matrix]
+    return [[float(x) for x in row] for row in matrix]
+
+
+def _integral(x):
+    """Returns an integral Fraction as an int, anything else unchanged."""
+    if isinstance(x, Fraction) and x.denominator == 1:
+        return x.numerator
+    return x
+
+
+def _validate(matrix):
+    """Checks that matrix is a non-empty square list of lists."""
     if not isinstance(matrix, list) or not all(isinstance(row, list) for row in matrix):
         raise TypeError("matrix must be a list of lists")
     if len(matrix) == 0 or any(len(row) != len(matrix) for row in matrix):
         raise ValueError("matrix must be a non-empty square matrix")
-    
-    det = determinant(matrix)
-    if det == 0:
-        return None
-    
-    adj = adjugate(matrix)
-    return [
-        [adj[i][j] / det for j in range(len(matrix))]
-        for i in range(len(matrix))
-    ]
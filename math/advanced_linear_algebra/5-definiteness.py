@@ -11,36 +11,277 @@ A matrix can be classified as:
 - Negative semi-definite
 - Indefinite
 
-It uses eigenvalues of the matrix to make this determination, after verifying 
-if the matrix is symmetric.
+After verifying that the matrix is symmetric, it first tries a Cholesky
+factorization of the matrix (and of its negation), which settles the
+definite cases early, and only computes the eigenvalues of the symmetric
+matrix with numpy.linalg.eigvalsh when both fail. Eigenvalues within a
+tolerance of zero count as zero, which decides the semi-definite cases.
+Large sparse matrices (scipy.sparse, when scipy is installed) are
+classified from their extremal eigenvalues, found by the Lanczos method;
+when the Lanczos steps run out before the extremal Ritz values converge,
+only an indefinite matrix is certain, and any other matrix falls back to
+eigvalsh, or to scipy.sparse.linalg.eigsh in shift-invert mode for a
+sparse matrix too large to be made dense.
+
+`batch_definiteness` classifies a whole numpy stack of matrices at once,
+returning either the labels or their integer codes, the index of each label
+in DEFINITENESS (0 for a matrix that is not symmetric).
 """
 
 import numpy as np
 
+try:
+    import scipy.sparse as sparse
+    import scipy.sparse.linalg as sparse_linalg
+except ImportError:
+    sparse = None
+
+
+DEFINITENESS = (
+    None,
+    "Positive definite",
+    "Positive semi-definite",
+    "Negative definite",
+    "Negative semi-definite",
+    "Indefinite",
+)
+
+EPSILON = np.finfo(float).eps
+
+# default maximum number of Lanczos steps; every step keeps one vector of
+# the size of the matrix
+LANCZOS_STEPS = 100
+
+# largest sparse matrix whose eigenvalues are computed densely when the
+# Lanczos method has not converged
+DENSE_LIMIT = 4096
+
+
+def definiteness(matrix, tol=None, method='auto', max_iter=None):
+    """
+    Determines the definiteness of a matrix.
+
+    Args:
+        matrix (numpy.ndarray): Square matrix, or a scipy.sparse matrix.
+        tol (float): Eigenvalues with an absolute value up to tol count as
+            zero; by default n * eps * max(abs(matrix)).
+        method (str): 'cholesky' (Cholesky first, eigvalsh when needed),
+            'lanczos' (extremal eigenvalues by the Lanczos method), or
+            'auto' for 'lanczos' on sparse matrices and 'cholesky'
+            otherwise.
+        max_iter (int): Maximum number of Lanczos steps; by default
+            min(n, LANCZOS_STEPS). Ritz values lie inside the spectrum, so
+            'Indefinite' is certain even before they converge; any other
+            label is only given once they have converged, and otherwise
+            the extremal eigenvalues are computed by eigvalsh or eigsh.
+
+    Returns:
+        str: The definiteness of the matrix, or None if it is not a
+        non-empty symmetric square matrix.
 
-def definiteness(matrix):
-    """Determines the definiteness of a matrix."""
+    Example:
+        The Laplacian of a path graph is singular positive semi-definite,
+        which the Lanczos steps alone cannot prove:
+
+        >>> import scipy.sparse
+        >>> n = 2000
+        >>> diagonal = np.r_[1., np.full(n - 2, 2.), 1.]
+        >>> laplacian = scipy.sparse.diags(
+        ...     [diagonal, -1., -1.], [0, 1, -1], shape=(n, n), format='csr')
+        >>> definiteness(laplacian)
+        'Positive semi-definite'
+        >>> definiteness(laplacian - 1e-4 * scipy.sparse.identity(n))
+        'Indefinite'
+    """
     # Validate input
-    if not isinstance(matrix, np.ndarray):
+    is_sparse = sparse is not None and sparse.issparse(matrix)
+    if not isinstance(matrix, np.ndarray) and not is_sparse:
         raise TypeError("matrix must be a numpy.ndarray")
-    if matrix.size == 0 or matrix.shape[0] != matrix.shape[1]:
+    if matrix.ndim != 2 or matrix.shape[0] == 0 or \
+            matrix.shape[0] != matrix.shape[1]:
         return None  # Invalid input: return None
-    
+    if method not in ('auto', 'cholesky', 'lanczos'):
+        raise ValueError("method must be 'auto', 'cholesky' or 'lanczos'")
+
     # Check if the matrix is symmetric
-    if not np.allclose(matrix, matrix.T):
+    n = matrix.shape[0]
+    scale = abs(matrix).max()
+    if is_sparse:
+        if abs(matrix - matrix.T).max() > 1e-8 + 1e-5 * scale:
+            return None
+    elif not np.allclose(matrix, matrix.T):
         return None  # Matrix is not symmetric, return None
-    
-    # Compute eigenvalues
-    eigenvalues = np.linalg.eigvals(matrix)
-    
-    # Check definiteness conditions
-    if np.all(eigenvalues > 0):
-        return "Positive definite"
-    elif np.all(eigenvalues >= 0):
-        return "Positive semi-definite"
-    elif np.all(eigenvalues < 0):
-        return "Negative definite"
-    elif np.all(eigenvalues <= 0):
-        return "Negative semi-definite"
+    if tol is None:
+        tol = n * EPSILON * scale
+
+    if method == 'lanczos' or (method == 'auto' and is_sparse):
+        low, high, converged = _lanczos_extremes(matrix, tol, max_iter)
+        if converged or (low < -tol and high > tol):
+            return _label(low, high, tol)
+        low, high = _extremes(matrix)
+        return _label(low, high, tol)
+
+    if is_sparse:
+        matrix = matrix.toarray()
+    a = np.asarray(matrix, dtype=float)
+    a = (a + a.T) / 2
+
+    # All eigenvalues above tol exactly when A - tol * I is positive
+    # definite; a diagonal entry at most tol already rules that out
+    shift = tol * np.eye(n)
+    diagonal = np.diag(a)
+    if np.all(diagonal > tol) and _cholesky(a - shift):
+        return DEFINITENESS[1]
+    if np.all(diagonal < -tol) and _cholesky(-a - shift):
+        return DEFINITENESS[3]
+
+    eigenvalues = np.linalg.eigvalsh(a)
+    return _label(eigenvalues[0], eigenvalues[-1], tol)
+
+
+def batch_definiteness(matrices, codes=False, tol=None):
+    """
+    Determines the definiteness of a stack of matrices at once.
+
+    Args:
+        matrices (numpy.ndarray): Shape (batch, n, n) stack of matrices.
+        codes (bool): If True, return the integer code of each label, its
+            index in DEFINITENESS, instead of the label itself.
+        tol (float): Eigenvalues with an absolute value up to tol count as
+            zero; by default n * eps * max(abs(matrix)) for each matrix.
+
+    Returns:
+        numpy.ndarray: Shape (batch,) object array of labels, None for a
+        matrix that is not symmetric, or int array of codes.
+    """
+    if not isinstance(matrices, np.ndarray):
+        raise TypeError("matrices must be a numpy.ndarray")
+    if matrices.ndim != 3 or matrices.shape[1] != matrices.shape[2]:
+        raise ValueError("matrices must have shape (batch, n, n)")
+
+    batch, n, _ = matrices.shape
+    if n == 0:
+        result = np.zeros(batch, dtype=int)
     else:
-        return "Indefinite"
+        transposed = matrices.transpose(0, 2, 1)
+        symmetric = np.isclose(matrices, transposed).all(axis=(1, 2))
+        if tol is None:
+            tol = n * EPSILON * np.abs(matrices).max(axis=(1, 2))
+        # eigvalsh only reads one triangle, so symmetrize before solving
+        eigenvalues = np.linalg.eigvalsh((matrices + transposed) / 2)
+        low, high = eigenvalues[:, 0], eigenvalues[:, -1]
+        result = np.select(
+            [~symmetric, low > tol, low >= -tol, high < -tol, high <= tol],
+            [0, 1, 2, 3, 4], default=5)
+
+    if codes:
+        return result
+    return np.array(DEFINITENESS, dtype=object)[result]
+
+
+def _label(low, high, tol):
+    """
+    Returns the definiteness of a symmetric matrix from its smallest and
+    largest eigenvalues.
+    """
+    if low > tol:
+        return DEFINITENESS[1]
+    if low >= -tol:
+        return DEFINITENESS[2]
+    if high < -tol:
+        return DEFINITENESS[3]
+    if high <= tol:
+        return DEFINITENESS[4]
+    return DEFINITENESS[5]
+
+
+def _cholesky(a):
+    """Returns True if the symmetric matrix a is positive definite."""
+    try:
+        np.linalg.cholesky(a)
+    except np.linalg.LinAlgError:
+        return False
+    return True
+
+
+def _lanczos_extremes(matrix, tol, max_iter=None):
+    """
+    Estimates the smallest and largest eigenvalues of a symmetric matrix by
+    the Lanczos method with full reorthogonalization.
+
+    Only products of the matrix with vectors are used, so the matrix may be
+    sparse. The iteration stops once the residuals of both extremal Ritz
+    values are at most tol, after an invariant subspace is found, or after
+    max_iter steps. The Ritz values are only computed on a geometric
+    schedule of steps, so that they cost O(steps^3) in total.
+
+    Returns the smallest and largest Ritz values, and whether they have
+    converged to the extremal eigenvalues, i.e. whether the iteration did
+    not stop on max_iter alone.
+    """
+    n = matrix.shape[0]
+    steps = min(n, LANCZOS_STEPS if max_iter is None else max_iter)
+    basis = np.empty((steps, n))
+    alpha = np.empty(steps)
+    beta = np.empty(steps)
+
+    v = np.random.default_rng(0).standard_normal(n)
+    basis[0] = v / np.linalg.norm(v)
+    check = 8
+    for j in range(steps):
+        w = np.asarray(matrix @ basis[j], dtype=float).ravel()
+        alpha[j] = basis[j] @ w
+        # full reorthogonalization against every previous Lanczos vector,
+        # twice, as a single Gram-Schmidt pass loses orthogonality once
+        # beta gets small
+        for _ in range(2):
+            w -= basis[:j + 1].T @ (basis[:j + 1] @ w)
+        beta[j] = np.linalg.norm(w)
+
+        scale = np.abs(alpha[:j + 1]).max() + np.abs(beta[:j + 1]).max()
+        invariant = beta[j] <= EPSILON * scale
+        if j + 1 == steps or j + 1 >= check or invariant:
+            check = int(check * 1.5)
+            tridiagonal = np.diag(alpha[:j + 1]) + np.diag(beta[:j], 1) + \
+                np.diag(beta[:j], -1)
+            ritz, vectors = np.linalg.eigh(tridiagonal)
+            residuals = beta[j] * np.abs(vectors[-1, [0, -1]])
+            converged = invariant or j + 1 == n or np.all(residuals <= tol)
+            if j + 1 == steps or converged:
+                break
+        basis[j + 1] = w / beta[j]
+
+    return ritz[0], ritz[-1], converged
+
+
+def _extremes(matrix):
+    """
+    Computes the smallest and largest eigenvalues of a symmetric matrix:
+    with eigvalsh up to DENSE_LIMIT rows, and above it, for a sparse
+    matrix, with eigsh in shift-invert mode, shifted just outside the
+    Gershgorin bounds of the spectrum so that each extremal eigenvalue is
+    the closest one to its shift.
+
+    Raises:
+        scipy.sparse.linalg.ArpackNoConvergence: If eigsh does not
+            converge.
+    """
+    n = matrix.shape[0]
+    is_sparse = sparse is not None and sparse.issparse(matrix)
+    if not is_sparse or n <= DENSE_LIMIT:
+        if is_sparse:
+            matrix = matrix.toarray()
+        a = np.asarray(matrix, dtype=float)
+        eigenvalues = np.linalg.eigvalsh((a + a.T) / 2)
+        return eigenvalues[0], eigenvalues[-1]
+
+    a = sparse.csr_matrix(matrix, dtype=float)
+    diagonal = a.diagonal()
+    radius = np.asarray(abs(a).sum(axis=1)).ravel() - np.abs(diagonal)
+    low, high = (diagonal - radius).min(), (diagonal + radius).max()
+    margin = np.sqrt(EPSILON) * max(high - low, abs(low), abs(high), 1.)
+    extremes = []
+    for sigma in (low - margin, high + margin):
+        extremes.append(sparse_linalg.eigsh(
+            a, k=1, sigma=sigma, which='LM', return_eigenvectors=False)[0])
+    return extremes[0], extremes[1]
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 import numpy as np
-from scipy.special import comb
+Posterior = __import__('bayes').Posterior
 
 def posterior(x, n, P, Pr):
     """
@@ -57,14 +57,8 @@ def posterior(x, n, P, Pr):
     if not np.isclose(np.sum(Pr), 1):
         raise ValueError("Pr must sum to 1")
 
-    # Compute the likelihood for each value in P
-    binomial_coeff = comb(n, x)  # Binomial coefficient C(n, x)
-    likelihoods = binomial_coeff * (P ** x) * ((1 - P) ** (n - x))
-    
-    # Compute the marginal probability
-    marginal_prob = np.sum(likelihoods * Pr)
-    
-    # Compute the posterior using Bayes' Theorem
-    posterior_prob = (likelihoods * Pr) / marginal_prob
+    # Compute the posterior using Bayes' Theorem, in log space so that the
+    # likelihoods do not underflow for large n
+    posterior_prob = Posterior(P, Pr).update(x, n).posterior
 
     return posterior_prob
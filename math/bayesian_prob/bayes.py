@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+This module contains a sequential Bayesian update engine for the
+probability P of developing severe side effects, given binomial
+observations (x patients with side effects out of n).
+
+The observations of an update only enter the likelihood through their
+totals, so a batch of any size costs one log-space pass over the grid of
+hypothetical probabilities, fusing the likelihood, intersection and
+marginal computations. Each posterior becomes the prior of the next
+update, so the history is never recomputed. A Beta(a, b) prior is
+conjugate to these observations: it is updated by adding the totals to
+a and b without touching the grid at all.
+"""
+
+import numpy as np
+from scipy.special import betaln, gammaln, logsumexp, xlog1py, xlogy
+
+
+def log_likelihood(x, n, P):
+    """
+    Calculates the log likelihood of a batch of observations for each
+    hypothetical probability in P.
+
+    Parameters:
+    - x (int or array-like): Numbers of patients that develop severe side
+      effects.
+    - n (int or array-like): Numbers of patients observed, broadcast
+      against x.
+    - P (numpy.ndarray): 1D array of hypothetical probabilities.
+
+    Returns:
+    - numpy.ndarray: The log likelihood of all the observations for each
+      probability in P.
+    """
+    x, n = _observations(x, n)
+    return _log_comb(x, n) + _log_kernel(x.sum(), n.sum(), P)
+
+
+class Posterior:
+    """
+    Posterior beliefs about P, updated sequentially in log space.
+
+    Attributes:
+    - P (numpy.ndarray): 1D array of hypothetical probabilities.
+    - log_posterior (numpy.ndarray): Log of the current posterior over P,
+      None while the engine follows a Beta posterior.
+    - beta (tuple): (a, b) of the current Beta posterior, None on the
+      grid.
+    - log_evidence (float): Log of the marginal probability of all the
+      observations so far. On the grid it is summed over P; under a Beta
+      prior it is the integral over the continuous interval [0, 1], so the
+      two paths give the same posterior on P but not the same evidence.
+    """
+
+    def __init__(self, P, Pr=None, beta=None):
+        """
+        Initializes the engine with prior beliefs.
+
+        Parameters:
+        - P (numpy.ndarray): 1D array of hypothetical probabilities.
+        - Pr (numpy.ndarray): 1D array of prior probabilities over P;
+          uniform by default.
+        - beta (tuple): (a, b) of a Beta prior, instead of Pr; the updates
+          then take the conjugate fast path.
+
+        Raises:
+        - TypeError: If P is not a 1D numpy.ndarray.
+        - TypeError: If Pr is not a 1D numpy.ndarray with the same shape
+          as P.
+        - ValueError: If any value in P or Pr is not in the range [0, 1].
+        - ValueError: If Pr does not sum to 1.
+        - ValueError: If a or b is not positive.
+        """
+        if not isinstance(P, np.ndarray) or P.ndim != 1:
+            raise TypeError("P must be a 1D numpy.ndarray")
+        if np.any((P < 0) | (P > 1)):
+            raise ValueError("All values in P must be in the range [0, 1]")
+        self.P = P
+        self.log_evidence = 0.
+        self.log_posterior = None
+        self.beta = None
+
+        if beta is not None:
+            a, b = beta
+            if a <= 0 or b <= 0:
+                raise ValueError("a and b must be positive")
+            self.beta = (float(a), float(b))
+            return
+
+        if Pr is None:
+            Pr = np.full(P.shape, 1 / P.size)
+        if not isinstance(Pr, np.ndarray) or Pr.ndim != 1:
+            raise TypeError("Pr must be a 1D numpy.ndarray")
+        if P.shape != Pr.shape:
+            raise TypeError(
+                "Pr must be a numpy.ndarray with the same shape as P")
+        if np.any((Pr < 0) | (Pr > 1)):
+            raise ValueError("All values in Pr must be in the range [0, 1]")
+        if not np.isclose(np.sum(Pr), 1):
+            raise ValueError("Pr must sum to 1")
+        with np.errstate(divide='ignore'):
+            self.log_posterior = np.log(Pr)
+
+    def update(self, x, n):
+        """
+        Updates the posterior with a batch of observations.
+
+        Parameters:
+        - x (int or array-like): Numbers of patients that develop severe
+          side effects.
+        - n (int or array-like): Numbers of patients observed, broadcast
+          against x.
+
+        Returns:
+        - Posterior: self, holding the posterior given every observation
+          so far.
+
+        Raises:
+        - ValueError: If any n is not a positive integer.
+        - ValueError: If any x is not an integer >= 0.
+        - ValueError: If any x is greater than its n.
+        """
+        x, n = _observations(x, n)
+        log_comb = _log_comb(x, n)
+        x, n = int(x.sum()), int(n.sum())
+
+        if self.beta is not None:
+            a, b = self.beta
+            self.log_evidence += log_comb + float(
+                betaln(a + x, b + n - x) - betaln(a, b))
+            self.beta = (a + x, b + n - x)
+            return self
+
+        # intersection, marginal and posterior in a single pass
+        log_intersection = self.log_posterior + _log_kernel(x, n, self.P)
+        log_marginal = logsumexp(log_intersection)
+        self.log_posterior = log_intersection - log_marginal
+        self.log_evidence += log_comb + float(log_marginal)
+        return self
+
+    @property
+    def posterior(self):
+        """
+        The posterior probabilities for each probability in P.
+
+        A Beta posterior is evaluated on P and normalized over it, like a
+        prior given as Pr.
+
+        Raises:
+        - ValueError: If P contains 0 while a < 1, or 1 while b < 1, where
+          the Beta density is infinite.
+        """
+        if self.beta is None:
+            return np.exp(self.log_posterior)
+        a, b = self.beta
+        if (a < 1 and np.any(self.P == 0)) or (b < 1 and np.any(self.P == 1)):
+            raise ValueError(
+                "The Beta density is infinite at P = 0 when a < 1 and at "
+                "P = 1 when b < 1: P must exclude these endpoints")
+        log_density = _log_kernel(a - 1, a + b - 2, self.P)
+        return np.exp(log_density - logsumexp(log_density))
+
+
+def _observations(x, n):
+    """
+    Validates observations and returns them as broadcast int arrays.
+    """
+    x, n = np.broadcast_arrays(np.asarray(x), np.asarray(n))
+    if n.dtype.kind not in 'iu' or np.any(n <= 0):
+        raise ValueError("n must be a positive integer")
+    if x.dtype.kind not in 'iu' or np.any(x < 0):
+        raise ValueError(
+            "x must be an integer that is greater than or equal to 0")
+    if np.any(x > n):
+        raise ValueError("x cannot be greater than n")
+    return x.astype(np.int64), n.astype(np.int64)
+
+
+def _log_comb(x, n):
+    """Returns the sum of the log binomial coefficients C(n, x)."""
+    return float(np.sum(gammaln(n + 1) - gammaln(x + 1) - gammaln(n - x + 1)))
+
+
+def _log_kernel(x, n, P):
+    """Returns x log(P) + (n - x) log(1 - P), with 0 log(0) = 0."""
+    return xlogy(x, P) + xlog1py(n - x, -P)
@@ -4,6 +4,7 @@ Performs a same convolution on grayscale images.
 """
 
 import numpy as np
+conv_gemm = __import__('im2col').conv_gemm
 
 
 def convolve_grayscale_same(images, kernel):
@@ -27,18 +28,10 @@ def convolve_grayscale_same(images, kernel):
     pad_h = kh // 2
     pad_w = kw // 2
 
-    padded_images = np.pad(
-    images,
-    ((0, 0), (pad_h, pad_h), (pad_w, pad_w)),
-    mode='constant'
-)
-    convolved = np.zeros((m, h, w))
+    convolved = conv_gemm(
+        images[..., np.newaxis], kernel[..., np.newaxis, np.newaxis],
+        padding=(pad_h, pad_w)
+    )
 
-    for i in range(h):
-        for j in range(w):
-            convolved[:, i, j] = np.sum(
-                padded_images[:, i:i+kh, j:j+kw] * kernel,
-                axis=(1, 2)
-            )
-
-    return convolved
+    # even kernels yield one extra row/column, which is dropped
+    return convolved[:, :h, :w, 0]
@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 """Performs a convolution on grayscale images with padding and stride"""
 import numpy as np
+select_conv = __import__('fft_conv').select_conv
 
 
-def convolve_grayscale(images, kernel, padding='same', stride=(1, 1)):
+def convolve_grayscale(images, kernel, padding='same', stride=(1, 1),
+                       method='auto'):
     """Performs a convolution on grayscale images
 
     Args:
@@ -11,6 +13,10 @@ def convolve_grayscale(images, kernel, padding='same', stride=(1, 1)):
         kernel (numpy.ndarray): Kernel for convolution of shape (kh, kw)
         padding (tuple, str): Padding (ph, pw), 'same', or 'valid'
         stride (tuple): Stride (sh, sw)
+        method (str): 'direct' (im2col GEMM), 'fft', 'separable' (two
+            1-D passes for a rank-1 kernel), or 'auto' to pick the
+            cheapest engine for the kernel and image sizes ('direct' for
+            integer images and kernels, which stay exact)
 
     Returns:
         numpy.ndarray: The convolved images
@@ -28,26 +34,11 @@ def convolve_grayscale(images, kernel, padding='same', stride=(1, 1)):
     else:
         ph, pw = padding
 
-    # Compute output dimensions
-    h_new = (h + 2 * ph - kh) // sh + 1
-    w_new = (w + 2 * pw - kw) // sw + 1
+    # Perform convolution with the selected engine
+    images = images[..., np.newaxis]
+    kernel = kernel[..., np.newaxis, np.newaxis]
+    conv = select_conv(images.shape, kernel, (ph, pw), (sh, sw), method,
+                       dtype=images.dtype)
+    convolved = conv(images, kernel, padding=(ph, pw), stride=(sh, sw))
 
-    # Apply padding
-    images_padded = np.pad(
-        images, ((0, 0), (ph, ph), (pw, pw)), mode='constant'
-    )
-
-    # Initialize output
-    convolved = np.zeros((m, h_new, w_new))
-
-    # Perform convolution
-    for i in range(h_new):
-        for j in range(w_new):
-            i_start, i_end = i * sh, i * sh + kh
-            j_start, j_end = j * sw, j * sw + kw
-            convolved[:, i, j] = np.sum(
-                images_padded[:, i_start:i_end, j_start:j_end] * kernel,
-                axis=(1, 2)
-            )
-
-    return convolved
+    return convolved[..., 0]
@@ -1,55 +1,174 @@
 #!/usr/bin/env python3
+from functools import partial
 import numpy as np
+select_conv = __import__('fft_conv').select_conv
+conv_gemm_backward = __import__('im2col').conv_gemm_backward
+block_images = __import__('im2col').block_images
+batch = __import__('batch')
+map_shards = __import__('parallel').map_shards
 
 """
 This module performs convolution on multiple images using multiple kernels.
 It supports both 'same' and 'valid' padding, as well as customizable strides.
 The `convolve` function takes images, kernels, padding, and stride as inputs,
-and returns the convolved images.
+and returns the convolved images. The `convolve_backward` function returns
+the gradients of a convolution with respect to its images and kernels, and
+`check_convolve_backward` compares them against finite differences.
 """
 
-def convolve(images, kernels, padding='same', stride=(1, 1)):
+def convolve(images, kernels, padding='same', stride=(1, 1), method='auto',
+             chunk_size=None, max_memory=None, out=None, workers=None,
+             dilation=(1, 1), groups=1):
     """
     Perform convolution on multiple images using multiple kernels.
 
     images: numpy.ndarray of shape (m, h, w, c) containing multiple images
-    kernels: numpy.ndarray of shape (kh, kw, c, nc) containing the kernels
+    kernels: numpy.ndarray of shape (kh, kw, c // groups, nc) containing
+             the kernels
     padding: 'same', 'valid', or a tuple (ph, pw) for padding
     stride: tuple (sh, sw) indicating the stride for the height and width
+    method: 'direct' (im2col GEMM), 'fft', 'separable' (two 1-D passes,
+            for kernels whose 2-D slices are all rank-1), or 'auto' to
+            pick the cheapest engine for the kernels and image sizes
+            ('direct' for integer images and kernels, which stay exact)
+    chunk_size: number of images convolved at once; by default the whole
+                batch. Each chunk is padded on its own, so images may be a
+                numpy.memmap larger than memory
+    max_memory: working memory budget in bytes, used to derive chunk_size
+                when it is not given
+    out: optional numpy.ndarray (or numpy.memmap) of shape
+         (m, out_h, out_w, nc) that receives the output
+    workers: number of processes the images are sharded across; the
+             results are bitwise identical to the single process path
+    dilation: tuple (dh, dw) indicating the spacing between the pixels
+              the kernels visit
+    groups: number of groups the channels are split into; output channels
+            [g * nc / groups, (g + 1) * nc / groups) only see the input
+            channels [g * c / groups, (g + 1) * c / groups). groups == c
+            is a depthwise convolution
 
-    Returns: numpy.ndarray containing the convolved images
+    Returns: numpy.ndarray containing the convolved images (out if given)
     """
     m, h, w, c = images.shape
-    kh, kw, _, nc = kernels.shape
+    kh, kw, cg, nc = kernels.shape
     sh, sw = stride
+    dh, dw = dilation
+    if cg * groups != c or nc % groups:
+        raise ValueError("kernels do not match the channels and groups")
 
-    # Handle padding
-    if padding == 'same':
-        ph = (kh - 1) // 2
-        pw = (kw - 1) // 2
-        padded_images = np.pad(images, ((0, 0), (ph, ph), (pw, pw), (0, 0)), mode='constant')
-    elif padding == 'valid':
-        ph = pw = 0
-        padded_images = images
-    else:
-        ph, pw = padding
-        padded_images = np.pad(images, ((0, 0), (ph, ph), (pw, pw), (0, 0)), mode='constant')
-
-    # Output dimensions
+    # Handle padding, for the extent of the dilated kernels
+    kh = (kh - 1) * dh + 1
+    kw = (kw - 1) * dw + 1
+    ph, pw = _padding(padding, kh, kw)
+
+    # Perform the convolution for every image and kernel at once
+    conv = partial(
+        select_conv(images.shape, kernels, (ph, pw), (sh, sw), method,
+                    dilation, groups, images.dtype),
+        kernels=kernels, padding=(ph, pw), stride=(sh, sw),
+        dilation=(dh, dw), groups=groups)
+    image_bytes = batch.conv_image_bytes(
+        images.shape, (kh, kw, cg, nc), (ph, pw), (sh, sw))
+    chunk = batch.chunk_length(image_bytes, chunk_size, max_memory)
+    parallel = workers is not None and workers > 1
+    if chunk is None and out is None and not parallel:
+        return conv(images)
+
+    # Otherwise stream the images through the output buffer in chunks
     out_h = (h + 2 * ph - kh) // sh + 1
     out_w = (w + 2 * pw - kw) // sw + 1
+    out = batch.output_buffer(out, (m, out_h, out_w, nc))
+    if parallel:
+        return map_shards(conv, images, out, workers, chunk,
+                          block_images(out_h, out_w))
+    return batch.map_chunks(conv, images, chunk or max(m, 1), out)
 
-    # Initialize output
-    output = np.zeros((m, out_h, out_w, nc))
 
-    # Perform convolution
-    for i in range(out_h):
-        for j in range(out_w):
-            # Extract the region of the image that the kernel will convolve with
-            region = padded_images[:, i * sh:i * sh + kh, j * sw:j * sw + kw, :]
+def convolve_backward(dZ, images, kernels, padding='same', stride=(1, 1),
+                      dilation=(1, 1), groups=1):
+    """
+    Perform back propagation over a convolution.
 
-            for k in range(nc):
-                # Perform the convolution for each kernel
-                output[:, i, j, k] = np.sum(region * kernels[:, :, :, k], axis=(1, 2, 3))
+    dZ: numpy.ndarray of shape (m, out_h, out_w, nc) containing the gradient
+        of the cost with respect to the output of convolve
+    images: numpy.ndarray of shape (m, h, w, c) containing multiple images
+    kernels: numpy.ndarray of shape (kh, kw, c // groups, nc) containing
+             the kernels
+    padding: 'same', 'valid', or a tuple (ph, pw) for padding
+    stride: tuple (sh, sw) indicating the stride for the height and width
+    dilation: tuple (dh, dw) indicating the dilation of the kernels
+    groups: number of groups the channels are split into
 
-    return output
+    Returns: dX, dK, the gradients with respect to images and kernels
+    """
+    kh, kw, _, _ = kernels.shape
+    dh, dw = dilation
+    ph, pw = _padding(padding, (kh - 1) * dh + 1, (kw - 1) * dw + 1)
+
+    return conv_gemm_backward(dZ, images, kernels, (ph, pw), stride,
+                              dilation, groups)
+
+
+def check_convolve_backward(images, kernels, padding='same', stride=(1, 1),
+                            dilation=(1, 1), groups=1, epsilon=1e-6):
+    """
+    Check convolve_backward against central finite differences.
+
+    The cost used is sum(convolve(images, kernels) * G) for a random G, so
+    every output position contributes to the gradient. Meant for small
+    inputs: it runs two convolutions per element of images and kernels.
+
+    images: numpy.ndarray of shape (m, h, w, c) containing multiple images
+    kernels: numpy.ndarray of shape (kh, kw, c // groups, nc) containing
+             the kernels
+    padding: 'same', 'valid', or a tuple (ph, pw) for padding
+    stride: tuple (sh, sw) indicating the stride for the height and width
+    dilation: tuple (dh, dw) indicating the dilation of the kernels
+    groups: number of groups the channels are split into
+    epsilon: step of the finite differences
+
+    Returns: the relative errors of dX and dK
+    """
+    images = images.astype(float)
+    kernels = kernels.astype(float)
+
+    def forward():
+        """Convolution whose gradients are checked"""
+        return convolve(images, kernels, padding, stride, method='direct',
+                        dilation=dilation, groups=groups)
+
+    def cost():
+        """Cost whose gradient with respect to the output is G"""
+        return np.sum(forward() * G)
+
+    G = np.random.randn(*forward().shape)
+    dX, dK = convolve_backward(G, images, kernels, padding, stride,
+                               dilation, groups)
+
+    errors = []
+    for param, grad in ((images, dX), (kernels, dK)):
+        numeric = np.zeros(param.shape)
+        for i in np.ndindex(*param.shape):
+            old = param[i]
+            param[i] = old + epsilon
+            plus = cost()
+            param[i] = old - epsilon
+            minus = cost()
+            param[i] = old
+            numeric[i] = (plus - minus) / (2 * epsilon)
+        scale = max(np.linalg.norm(grad) + np.linalg.norm(numeric), 1e-12)
+        errors.append(np.linalg.norm(grad - numeric) / scale)
+
+    return errors[0], errors[1]
+
+
+def _padding(padding, kh, kw):
+    """
+    Resolve a padding argument of convolve into a tuple (ph, pw).
+    """
+    if padding == 'same':
+        return (kh - 1) // 2, (kw - 1) // 2
+    if padding == 'valid':
+        return 0, 0
+    ph, pw = padding
+    return ph, pw
@@ -1,5 +1,9 @@
 #!/usr/bin/env python3
+from functools import partial
 import numpy as np
+im2col = __import__('im2col').im2col
+batch = __import__('batch')
+map_shards = __import__('parallel').map_shards
 
 
 """
@@ -10,10 +14,15 @@ images and uses a kernel and stride to control the pooling process.
 The `pool` function takes as input the images, kernel shape, stride, and the
 mode (either 'max' or 'avg') and performs the respective pooling operation.
 It returns the pooled images as a numpy.ndarray.
+
+The `pool_backward` function routes the gradient of the pooled images back
+to the input images, using the argmax positions cached by `pool` for max
+pooling.
 """
 
 
-def pool(images, kernel_shape, stride, mode='max'):
+def pool(images, kernel_shape, stride, mode='max', return_indices=False,
+         chunk_size=None, max_memory=None, out=None, workers=None):
     """
     Perform pooling on images with channels.
 
@@ -21,8 +30,21 @@ def pool(images, kernel_shape, stride, mode='max'):
     kernel_shape: tuple (kh, kw) for the kernel shape
     stride: tuple (sh, sw) indicating the stride in height and width
     mode: 'max' for max pooling, 'avg' for average pooling
+    return_indices: if True with max pooling, also return the position of
+                    the maximum inside each window, as a flat index in
+                    [0, kh * kw), for use with pool_backward
+    chunk_size: number of images pooled at once; by default the whole
+                batch, so images may be a numpy.memmap larger than memory
+    max_memory: working memory budget in bytes, used to derive chunk_size
+                when it is not given
+    out: optional numpy.ndarray (or numpy.memmap) of shape
+         (m, out_h, out_w, c) that receives the pooled images; with
+         return_indices it may be a tuple (pooled images, indices)
+    workers: number of processes the images are sharded across; the
+             results are bitwise identical to the single process path
 
-    Returns: numpy.ndarray containing the pooled images
+    Returns: numpy.ndarray containing the pooled images, or a tuple of
+             (pooled images, indices) when return_indices is True
     """
     m, h, w, c = images.shape
     kh, kw = kernel_shape
@@ -32,18 +54,91 @@ def pool(images, kernel_shape, stride, mode='max'):
     out_h = (h - kh) // sh + 1
     out_w = (w - kw) // sw + 1
 
-    # Initialize output
-    output = np.zeros((m, out_h, out_w, c))
+    # the window copy made for the indices dominates the working memory
+    image_bytes = 8 * out_h * out_w * c * (kh * kw if return_indices else 2)
+    chunk = batch.chunk_length(image_bytes, chunk_size, max_memory)
+    parallel = workers is not None and workers > 1
+    if chunk is not None or out is not None or parallel:
+        shape = (m, out_h, out_w, c)
+        pooled, indices = out if isinstance(out, tuple) else (out, None)
+        # only max pooling has indices to collect
+        with_indices = return_indices and mode == 'max'
+        out = batch.output_buffer(pooled, shape)
+        if with_indices:
+            out = (out, batch.output_buffer(indices, shape, dtype=np.intp))
+        fn = partial(pool, kernel_shape=kernel_shape, stride=stride,
+                     mode=mode, return_indices=with_indices)
+        if parallel:
+            out = map_shards(fn, images, out, workers, chunk)
+        else:
+            out = batch.map_chunks(fn, images, chunk or max(m, 1), out)
+        if return_indices and not with_indices:
+            return out, None
+        return out
 
-    # Perform pooling
-    for i in range(out_h):
-        for j in range(out_w):
-            # Extract the current region of the image
-            region = images[:, i * sh:i * sh + kh, j * sw:j * sw + kw, :]
+    # View every window at once, without copying the images
+    if (sh, sw) == (kh, kw):
+        windows = images[:, :out_h * kh, :out_w * kw, :].reshape(
+            m, out_h, kh, out_w, kw, c)
+        axes = (2, 4)
+    else:
+        windows = im2col(images, (kh, kw), stride=(sh, sw))
+        axes = (3, 4)
 
-            if mode == 'max':
-                output[:, i, j, :] = np.max(region, axis=(1, 2))
-            elif mode == 'avg':
-                output[:, i, j, :] = np.mean(region, axis=(1, 2))
+    indices = None
+    if mode == 'max':
+        output = np.max(windows, axis=axes)
+        if return_indices:
+            if axes == (2, 4):
+                windows = windows.transpose(0, 1, 3, 2, 4, 5)
+            flat = windows.reshape(m, out_h, out_w, kh * kw, c)
+            indices = np.argmax(flat, axis=3)
+    elif mode == 'avg':
+        output = np.mean(windows, axis=axes)
+    else:
+        output = np.zeros((m, out_h, out_w, c))
 
+    output = output.astype(float, copy=False)
+    if return_indices:
+        return output, indices
     return output
+
+
+def pool_backward(dA, images_shape, kernel_shape, stride, mode='max',
+                  indices=None):
+    """
+    Perform back propagation over a pooling layer.
+
+    dA: numpy.ndarray of shape (m, out_h, out_w, c) containing the gradient
+        of the cost with respect to the pooled images
+    images_shape: tuple (m, h, w, c) of the images that were pooled
+    kernel_shape: tuple (kh, kw) for the kernel shape
+    stride: tuple (sh, sw) indicating the stride in height and width
+    mode: 'max' for max pooling, 'avg' for average pooling
+    indices: numpy.ndarray of shape (m, out_h, out_w, c) returned by pool
+             with return_indices=True, required for max pooling
+
+    Returns: numpy.ndarray of shape (m, h, w, c) containing the gradient
+             with respect to the images
+    """
+    _, out_h, out_w, _ = dA.shape
+    kh, kw = kernel_shape
+    sh, sw = stride
+
+    if mode == 'max' and indices is None:
+        raise ValueError("indices are required for max pooling")
+
+    dX = np.zeros(images_shape)
+    if mode == 'avg':
+        dA = dA / (kh * kw)
+
+    # One vectorized pass per window offset instead of per output position
+    for a in range(kh):
+        for b in range(kw):
+            grad = dA
+            if mode == 'max':
+                grad = dA * (indices == a * kw + b)
+            dX[:, a:a + (out_h - 1) * sh + 1:sh,
+               b:b + (out_w - 1) * sw + 1:sw, :] += grad
+
+    return dX
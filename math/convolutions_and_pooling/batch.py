@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Defines helpers that stream the image axis of a batch in chunks, so that
+the peak memory of a convolution or pooling does not grow with the number
+of images
+"""
+import numpy as np
+
+
+def chunk_length(image_bytes, chunk_size=None, max_memory=None):
+    """
+    Computes how many images are processed at once
+
+    Arguments:
+     - image_bytes is the estimated working memory needed per image
+     - chunk_size is the number of images per chunk, if set by the caller
+     - max_memory is the working memory budget in bytes, used when
+        chunk_size is not set
+
+    Returns:
+     the number of images per chunk, or None to process the whole batch
+    """
+    if chunk_size is not None:
+        return max(int(chunk_size), 1)
+    if max_memory is not None:
+        return max(int(max_memory // max(image_bytes, 1)), 1)
+    return None
+
+
+def conv_image_bytes(images_shape, kernels_shape, padding, stride):
+    """
+    Estimates the working memory per image of the convolution engines
+
+    Arguments:
+     - images_shape is the shape (m, h, w, c) of the images
+     - kernels_shape is the shape (kh, kw, c, nc) of the kernels
+     - padding is a tuple of (ph, pw) of zeros added on each side
+     - stride is a tuple of (sh, sw) containing the stride
+
+    Returns:
+     the larger estimate, in bytes, of the im2col and FFT engines
+    """
+    _, h, w, c = images_shape
+    kh, kw, _, nc = kernels_shape
+    h_p = h + 2 * padding[0]
+    w_p = w + 2 * padding[1]
+    out_h = (h_p - kh) // stride[0] + 1
+    out_w = (w_p - kw) // stride[1] + 1
+
+    # padded image, patch matrix and output
+    gemm = 8 * (h_p * w_p * c + out_h * out_w * (kh * kw * c + nc))
+    # complex half-spectra of the image and the output, real output
+    fft = 16 * h_p * (w_p // 2 + 1) * (c + nc) + 8 * h_p * w_p * nc
+
+    return max(gemm, fft)
+
+
+def map_chunks(fn, images, chunk, out):
+    """
+    Applies fn to consecutive chunks of images and stores the results
+
+    Arguments:
+     - fn is the function applied to each chunk; it returns an array, or a
+        tuple of arrays, indexed by image along the first axis
+     - images is a numpy.ndarray (or numpy.memmap) indexed by image along
+        the first axis; only one chunk of it is read at a time
+     - chunk is the number of images per chunk
+     - out is the numpy.ndarray (or numpy.memmap), or tuple of them, that
+        receives the results of fn
+
+    Returns:
+     out
+    """
+    outs = out if isinstance(out, tuple) else (out,)
+
+    for start in range(0, images.shape[0], chunk):
+        stop = start + chunk
+        results = fn(images[start:stop])
+        if not isinstance(results, tuple):
+            results = (results,)
+        for buffer, result in zip(outs, results):
+            buffer[start:stop] = result
+
+    return out
+
+
+def output_buffer(out, shape, dtype=float):
+    """
+    Returns out, or a new uninitialized array when out is None
+
+    Arguments:
+     - out is the caller provided output buffer, or None
+     - shape is the shape of the output
+     - dtype is the type of the output
+    """
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if out.shape != tuple(shape):
+        raise ValueError("out must have shape {}".format(tuple(shape)))
+    return out
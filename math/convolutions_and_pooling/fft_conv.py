@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Defines an FFT based convolution engine for large kernels and the helper
+that picks between it, the direct (im2col) engine and the separable engine
+"""
+import numpy as np
+conv_gemm = __import__('im2col').conv_gemm
+separable = __import__('separable')
+
+
+def conv_fft(images, kernels, padding=(0, 0), stride=(1, 1),
+             dilation=(1, 1), groups=1):
+    """
+    Convolves a batch of images with several kernels through the FFT
+
+    Arguments:
+     - images is a numpy.ndarray of shape (m, h, w, c) containing the images
+     - kernels is a numpy.ndarray of shape (kh, kw, c // groups, nc)
+        containing the kernels
+     - padding is a tuple of (ph, pw) of zeros added on each side
+     - stride is a tuple of (sh, sw) containing the stride
+     - dilation is a tuple of (dh, dw) containing the kernel dilation
+     - groups is the number of groups the channels are split into
+
+    Returns:
+     a numpy.ndarray of shape (m, out_h, out_w, nc) containing the
+        convolved images
+    """
+    kh, kw, cg, nc = kernels.shape
+    ph, pw = padding
+    sh, sw = stride
+    dh, dw = dilation
+    m, h, w, _ = images.shape
+    if (dh, dw) != (1, 1):
+        # the transform size does not depend on the kernel, so a dilated
+        # kernel costs the same as a dense one
+        kh = (kh - 1) * dh + 1
+        kw = (kw - 1) * dw + 1
+        dilated = np.zeros((kh, kw, cg, nc), dtype=kernels.dtype)
+        dilated[::dh, ::dw] = kernels
+        kernels = dilated
+    h_p = h + 2 * ph
+    w_p = w + 2 * pw
+    out_h = (h_p - kh) // sh + 1
+    out_w = (w_p - kw) // sw + 1
+
+    # the padding is folded into the transform size, so the padded images
+    # are never materialized: a (h_p, w_p) circular transform of the
+    # image placed at (ph, pw) is free of wrap-around past kh - 1, kw - 1
+    shape = (h_p, w_p)
+    F_img = np.fft.rfft2(images, s=shape, axes=(1, 2))
+    if ph or pw:
+        F_img *= _shift(shape, ph, pw)[np.newaxis, :, :, np.newaxis]
+
+    # the layers compute a cross-correlation, i.e. a convolution with the
+    # flipped kernels
+    F_ker = np.fft.rfft2(kernels[::-1, ::-1], s=shape, axes=(0, 1))
+
+    # sum over the channels of each group one channel at a time, so that
+    # every image is computed the same way whatever the size of the batch
+    fh, fw = F_ker.shape[:2]
+    F_img = F_img.reshape(m, fh, fw, groups, cg)
+    F_ker = F_ker.reshape(1, fh, fw, cg, groups, nc // groups)
+    F_out = F_img[..., 0, np.newaxis] * F_ker[:, :, :, 0]
+    for ch in range(1, cg):
+        F_out += F_img[..., ch, np.newaxis] * F_ker[:, :, :, ch]
+    full = np.fft.irfft2(F_out.reshape(m, fh, fw, nc), s=shape, axes=(1, 2))
+
+    return full[:, kh - 1:kh - 1 + (out_h - 1) * sh + 1:sh,
+                kw - 1:kw - 1 + (out_w - 1) * sw + 1:sw]
+
+
+def _shift(shape, ph, pw):
+    """
+    Builds the phase ramp that translates a half-spectrum by (ph, pw)
+
+    Arguments:
+     - shape is a tuple of (fh, fw) containing the transform size
+     - ph, pw are the translation along the height and width
+
+    Returns:
+     a numpy.ndarray of shape (fh, fw // 2 + 1)
+    """
+    fh, fw = shape
+    u = np.fft.fftfreq(fh)[:, np.newaxis]
+    v = np.fft.rfftfreq(fw)[np.newaxis, :]
+    return np.exp(-2j * np.pi * (u * ph + v * pw))
+
+
+def select_conv(images_shape, kernels, padding=(0, 0), stride=(1, 1),
+                method='auto', dilation=(1, 1), groups=1, dtype=None):
+    """
+    Picks the convolution engine to use
+
+    Arguments:
+     - images_shape is the shape (m, h, w, c) of the images
+     - kernels is a numpy.ndarray of shape (kh, kw, c // groups, nc)
+        containing the kernels
+     - padding is a tuple of (ph, pw) of zeros added on each side
+     - stride is a tuple of (sh, sw) containing the stride
+     - method is 'direct', 'fft', 'separable' or 'auto'; 'auto' compares
+        the estimated number of operations of the engines that apply and
+        returns the cheapest one
+     - dilation is a tuple of (dh, dw) containing the kernel dilation
+     - groups is the number of groups the channels are split into
+     - dtype is the dtype of the images; 'auto' keeps integer images
+        convolved with integer kernels on the direct engine, whose
+        results stay exact integers
+
+    Returns:
+     conv_gemm, conv_fft or conv_separable
+    """
+    if method == 'direct':
+        return conv_gemm
+    if method == 'fft':
+        return conv_fft
+    if method == 'separable':
+        if separable.rank1_factors(kernels) is None:
+            raise ValueError("kernels are not separable")
+        return separable.conv_separable
+    if method != 'auto':
+        raise ValueError(
+            "method must be 'direct', 'fft', 'separable' or 'auto'")
+
+    if dtype is not None and np.dtype(dtype).kind in 'biu' and \
+            kernels.dtype.kind in 'biu':
+        return conv_gemm
+
+    m, h, w, c = images_shape
+    kh, kw, cg, nc = kernels.shape
+    kh_d = (kh - 1) * dilation[0] + 1
+    kw_d = (kw - 1) * dilation[1] + 1
+    h_p = h + 2 * padding[0]
+    w_p = w + 2 * padding[1]
+    out_h = (h_p - kh_d) // stride[0] + 1
+    out_w = (w_p - kw_d) // stride[1] + 1
+
+    costs = {conv_gemm: m * out_h * out_w * kh * kw * cg * nc}
+
+    size = h_p * w_p
+    transforms = (m * c + m * nc + cg * nc) * size * np.log2(max(size, 2))
+    products = 2 * m * size * cg * nc
+    # complex arithmetic and the transforms run about twice as slow per
+    # operation as the BLAS multiply-add the direct engine relies on
+    costs[conv_fft] = 2 * (transforms + products)
+
+    if kh > 1 and kw > 1:
+        # two 1-D passes, the first one over every padded row
+        passes = m * out_w * cg * nc * (h_p * kw + out_h * kh)
+        if passes < costs[conv_gemm] and \
+                separable.rank1_factors(kernels) is not None:
+            costs[separable.conv_separable] = passes
+
+    return min(costs, key=costs.get)
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Defines helpers that lay image patches out as a matrix (im2col) so that a
+whole batch of convolutions runs as a single matrix multiplication
+"""
+import numpy as np
+
+
+BLOCK_ROWS = 1 << 16
+
+
+def im2col(images, kernel_shape, padding=(0, 0), stride=(1, 1),
+           dilation=(1, 1)):
+    """
+    Builds a zero-copy strided view of every patch a kernel visits
+
+    Arguments:
+     - images is a numpy.ndarray of shape (m, h, w, c) containing the images
+     - kernel_shape is a tuple of (kh, kw) containing the kernel shape
+     - padding is a tuple of (ph, pw) of zeros added on each side
+     - stride is a tuple of (sh, sw) containing the stride
+     - dilation is a tuple of (dh, dw) containing the spacing between the
+        pixels a kernel visits
+
+    Returns:
+     a read-only numpy.ndarray of shape (m, out_h, out_w, kh, kw, c)
+        containing the patch under the kernel for each output position
+    """
+    kh, kw = kernel_shape
+    ph, pw = padding
+    sh, sw = stride
+    dh, dw = dilation
+
+    if ph or pw:
+        images = np.pad(
+            images, ((0, 0), (ph, ph), (pw, pw), (0, 0)), mode='constant'
+        )
+    m, h, w, c = images.shape
+    out_h = (h - (kh - 1) * dh - 1) // sh + 1
+    out_w = (w - (kw - 1) * dw - 1) // sw + 1
+
+    s_m, s_h, s_w, s_c = images.strides
+    return np.lib.stride_tricks.as_strided(
+        images,
+        shape=(m, out_h, out_w, kh, kw, c),
+        strides=(s_m, s_h * sh, s_w * sw, s_h * dh, s_w * dw, s_c),
+        writeable=False
+    )
+
+
+def conv_gemm(images, kernels, padding=(0, 0), stride=(1, 1),
+              dilation=(1, 1), groups=1):
+    """
+    Convolves a batch of images with several kernels, one GEMM per block
+    of images
+
+    Arguments:
+     - images is a numpy.ndarray of shape (m, h, w, c) containing the images
+     - kernels is a numpy.ndarray of shape (kh, kw, c // groups, nc)
+        containing the kernels
+     - padding is a tuple of (ph, pw) of zeros added on each side
+     - stride is a tuple of (sh, sw) containing the stride
+     - dilation is a tuple of (dh, dw) containing the kernel dilation
+     - groups is the number of groups the channels are split into: output
+        channels [g * nc / groups, (g + 1) * nc / groups) only see input
+        channels [g * c / groups, (g + 1) * c / groups); groups == c is a
+        depthwise convolution
+
+    Returns:
+     a numpy.ndarray of shape (m, out_h, out_w, nc) containing the
+        convolved images
+    """
+    kh, kw, cg, nc = kernels.shape
+    patches = im2col(images, (kh, kw), padding, stride, dilation)
+    m, out_h, out_w = patches.shape[:3]
+    output = np.empty((m, out_h, out_w, nc))
+
+    # BLAS rounds differently depending on the number of rows of the
+    # product, so the GEMM runs over fixed blocks of images: an image gets
+    # the same result in any chunk of the batch that starts on a block
+    block = block_images(out_h, out_w)
+    for start in range(0, m, block):
+        if groups == 1:
+            # (block * out_h * out_w, kh * kw * c) @ (kh * kw * c, nc)
+            cols = patches[start:start + block].reshape(-1, kh * kw * cg)
+            result = np.dot(cols, kernels.reshape(kh * kw * cg, nc))
+        else:
+            # one GEMM per group,
+            # (G, block * out_h * out_w, kh * kw * cg) @ (G, kh * kw * cg, ncg)
+            cols = _group_cols(patches[start:start + block], groups)
+            result = np.matmul(cols, _group_kernels(kernels, groups))
+            result = result.transpose(1, 0, 2)
+        output[start:start + block] = result.reshape(-1, out_h, out_w, nc)
+
+    return output
+
+
+def block_images(out_h, out_w):
+    """
+    Computes the number of images conv_gemm multiplies at once
+
+    Arguments:
+     - out_h, out_w are the height and width of the convolved images
+
+    Returns:
+     the number of images whose patches fill about BLOCK_ROWS rows
+    """
+    return max(BLOCK_ROWS // max(out_h * out_w, 1), 1)
+
+
+def conv_gemm_backward(dZ, images, kernels, padding=(0, 0), stride=(1, 1),
+                       dilation=(1, 1), groups=1):
+    """
+    Back propagates over conv_gemm with one GEMM per gradient
+
+    Arguments:
+     - dZ is a numpy.ndarray of shape (m, out_h, out_w, nc) containing the
+        gradient of the cost with respect to the convolution output
+     - images is a numpy.ndarray of shape (m, h, w, c) containing the images
+     - kernels is a numpy.ndarray of shape (kh, kw, c // groups, nc)
+        containing the kernels
+     - padding is a tuple of (ph, pw) of zeros added on each side
+     - stride is a tuple of (sh, sw) containing the stride
+     - dilation is a tuple of (dh, dw) containing the kernel dilation
+     - groups is the number of groups the channels are split into
+
+    Returns:
+     dX, dK
+        - dX is a numpy.ndarray of shape (m, h, w, c) containing the gradient
+            with respect to the images
+        - dK is a numpy.ndarray of shape (kh, kw, c // groups, nc)
+            containing the gradient with respect to the kernels
+    """
+    kh, kw, cg, nc = kernels.shape
+    ph, pw = padding
+    sh, sw = stride
+    dh, dw = dilation
+    m, h, w, c = images.shape
+    _, out_h, out_w, _ = dZ.shape
+    M = m * out_h * out_w
+
+    patches = im2col(images, (kh, kw), padding, stride, dilation)
+    if groups == 1:
+        cols = patches.reshape(M, kh * kw * cg)
+        dZ_cols = dZ.reshape(M, nc)
+
+        # (kh * kw * c, M) @ (M, nc)
+        dK = np.dot(cols.T, dZ_cols).reshape(kh, kw, cg, nc)
+
+        # (M, nc) @ (nc, kh * kw * c)
+        dcols = np.dot(dZ_cols, kernels.reshape(kh * kw * cg, nc).T)
+    else:
+        cols = _group_cols(patches, groups)
+        dZ_cols = dZ.reshape(M, groups, nc // groups).transpose(1, 0, 2)
+
+        # (G, kh * kw * cg, M) @ (G, M, ncg)
+        dK = np.matmul(cols.transpose(0, 2, 1), dZ_cols)
+        dK = dK.transpose(1, 0, 2).reshape(kh, kw, cg, nc)
+
+        # (G, M, ncg) @ (G, ncg, kh * kw * cg)
+        dcols = np.matmul(
+            dZ_cols, _group_kernels(kernels, groups).transpose(0, 2, 1))
+        dcols = dcols.reshape(groups, M, kh, kw, cg).transpose(1, 2, 3, 0, 4)
+
+    # fold the patches back onto the images (col2im)
+    dcols = dcols.reshape(m, out_h, out_w, kh, kw, c)
+    dX = np.zeros((m, h + 2 * ph, w + 2 * pw, c))
+    for a in range(kh):
+        for b in range(kw):
+            dX[:, a * dh:a * dh + (out_h - 1) * sh + 1:sh,
+               b * dw:b * dw + (out_w - 1) * sw + 1:sw, :] += \
+                dcols[:, :, :, a, b, :]
+
+    return dX[:, ph:ph + h, pw:pw + w, :], dK
+
+
+def _group_cols(patches, groups):
+    """
+    Lays the patches out as one (M, kh * kw * cg) matrix per group
+
+    Arguments:
+     - patches is the (m, out_h, out_w, kh, kw, c) view built by im2col
+     - groups is the number of groups the channels are split into
+
+    Returns:
+     a numpy.ndarray of shape (groups, M, kh * kw * c // groups)
+    """
+    m, out_h, out_w, kh, kw, c = patches.shape
+    cols = patches.reshape(m, out_h, out_w, kh, kw, groups, c // groups)
+    cols = cols.transpose(5, 0, 1, 2, 3, 4, 6)
+    return cols.reshape(groups, m * out_h * out_w, kh * kw * (c // groups))
+
+
+def _group_kernels(kernels, groups):
+    """
+    Lays the kernels out as one (kh * kw * cg, ncg) matrix per group
+
+    Arguments:
+     - kernels is a numpy.ndarray of shape (kh, kw, cg, nc)
+     - groups is the number of groups the channels are split into
+
+    Returns:
+     a numpy.ndarray of shape (groups, kh * kw * cg, nc // groups)
+    """
+    kh, kw, cg, nc = kernels.shape
+    kernels = kernels.reshape(kh * kw * cg, groups, nc // groups)
+    return kernels.transpose(1, 0, 2)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Defines helpers that shard the image axis of a batch across a pool of
+worker processes, exchanging images and results through shared memory
+instead of pickling them
+"""
+import contextlib
+import mmap
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+import numpy as np
+map_chunks = __import__('batch').map_chunks
+
+try:
+    import threadpoolctl
+except ImportError:
+    threadpoolctl = None
+
+
+BLAS_THREADS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS')
+
+
+def map_shards(fn, images, out, workers, chunk=None, align=1):
+    """
+    Applies fn to shards of images in worker processes
+
+    Every shard is computed exactly as map_chunks computes a chunk and
+    starts on a multiple of align, so when fn computes its input in blocks
+    of align images the results are bitwise identical to the single
+    process path. Each worker limits
+    its BLAS library to cpu_count // workers threads, so that the workers
+    do not oversubscribe the cores.
+
+    Arguments:
+     - fn is a picklable function (e.g. a functools.partial of a module
+        level function) applied to each shard; it returns an array, or a
+        tuple of arrays, indexed by image along the first axis
+     - images is a numpy.ndarray indexed by image along the first axis; a
+        numpy.memmap is reopened by the workers, any other array is copied
+        once into shared memory
+     - out is the numpy.ndarray (or numpy.memmap), or tuple of them, that
+        receives the results of fn
+     - workers is the number of worker processes
+     - chunk is the number of images per task; by default the images are
+        split evenly across the workers. It is rounded up to a multiple
+        of align
+     - align is the number of images fn computes at once
+
+    Returns:
+     out
+    """
+    m = images.shape[0]
+    workers = max(min(int(workers), m), 1)
+    if chunk is None:
+        chunk = -(-m // workers)
+    chunk = -(-chunk // align) * align
+    outs = out if isinstance(out, tuple) else (out,)
+    threads = max((os.cpu_count() or 1) // workers, 1)
+
+    segments = []
+    shared = []
+    try:
+        images_spec = _share(images, segments, copy=True)[0]
+        shared.extend(_share(buffer, segments, copy=False) for buffer in outs)
+        tasks = [(fn, images_spec, [spec for spec, _ in shared],
+                  start, min(start + chunk, m))
+                 for start in range(0, m, chunk)]
+
+        with _blas_env(threads):
+            context = multiprocessing.get_context()
+            with context.Pool(workers, initializer=_limit_blas,
+                              initargs=(threads,)) as pool:
+                pool.starmap(_run_shard, tasks)
+
+        for buffer, (spec, view) in zip(outs, shared):
+            if spec[0] == 'shm':
+                buffer[...] = view
+    finally:
+        # the views must be released before their segments are closed
+        del shared[:]
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+
+    return out
+
+
+def _share(array, segments, copy):
+    """
+    Describes how a worker process reaches the memory of array
+
+    Arguments:
+     - array is the numpy.ndarray to share
+     - segments is the list that collects the shared memory segments
+        created, for the caller to release
+     - copy is True to copy the contents of array into shared memory
+
+    Returns:
+     spec, view
+        - spec is a picklable description of the memory for _attach
+        - view is the numpy.ndarray the parent reads the memory through
+    """
+    if (isinstance(array, np.memmap) and isinstance(array.base, mmap.mmap)
+            and array.flags.c_contiguous):
+        spec = ('memmap', array.filename, array.offset, array.shape,
+                array.dtype.str)
+        return spec, array
+
+    segment = shared_memory.SharedMemory(create=True,
+                                         size=max(array.nbytes, 1))
+    segments.append(segment)
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)
+    if copy:
+        view[...] = array
+    spec = ('shm', segment.name, array.shape, array.dtype.str)
+    return spec, view
+
+
+def _attach(spec, segments, mode='r+'):
+    """
+    Maps in a worker the memory described by _share
+
+    Arguments:
+     - spec is the description returned by _share
+     - segments is the list that collects the shared memory segments
+        attached, for the caller to close
+     - mode is the mode memory mapped files are opened with
+
+    Returns:
+     a numpy.ndarray over the shared memory
+    """
+    if spec[0] == 'memmap':
+        _, filename, offset, shape, dtype = spec
+        return np.memmap(filename, dtype=dtype, mode=mode, offset=offset,
+                         shape=shape)
+
+    _, name, shape, dtype = spec
+    segment = shared_memory.SharedMemory(name=name)
+    segments.append(segment)
+    return np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+
+
+def _run_shard(fn, images_spec, out_specs, start, stop):
+    """
+    Computes fn over images[start:stop] inside a worker process
+    """
+    segments = []
+    try:
+        images = _attach(images_spec, segments, mode='r')
+        outs = tuple(_attach(spec, segments)[start:stop]
+                     for spec in out_specs)
+        map_chunks(fn, images[start:stop], stop - start, outs)
+        del images, outs
+    finally:
+        for segment in segments:
+            segment.close()
+
+
+@contextlib.contextmanager
+def _blas_env(threads):
+    """
+    Sets the BLAS thread counts inherited by newly started processes
+    """
+    saved = {name: os.environ.get(name) for name in BLAS_THREADS}
+    os.environ.update({name: str(threads) for name in BLAS_THREADS})
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def _limit_blas(threads):
+    """
+    Limits the BLAS threads of a worker whose BLAS is already loaded
+    (forked workers), when threadpoolctl is available
+    """
+    if threadpoolctl is not None:
+        threadpoolctl.threadpool_limits(threads)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Defines a convolution engine for separable (rank-1) kernels, which applies
+two 1-D passes instead of one 2-D pass
+"""
+import numpy as np
+im2col = __import__('im2col').im2col
+block_images = __import__('im2col').block_images
+
+
+def rank1_factors(kernels, tol=1e-10):
+    """
+    Splits every 2-D kernel slice into the outer product of two vectors
+
+    Arguments:
+     - kernels is a numpy.ndarray of shape (kh, kw, cg, nc) containing
+        the kernels
+     - tol is the largest ratio between the second and the first singular
+        value of a slice for it to be treated as rank-1
+
+    Returns:
+     u, v, or None if a slice is not rank-1
+        - u is a numpy.ndarray of shape (kh, cg, nc)
+        - v is a numpy.ndarray of shape (kw, cg, nc)
+        such that kernels[:, :, i, n] == outer(u[:, i, n], v[:, i, n])
+    """
+    # one SVD per (cg, nc) slice of shape (kh, kw)
+    U, s, Vt = np.linalg.svd(kernels.transpose(2, 3, 0, 1))
+    if np.any(s[..., 1:] > tol * s[..., :1]):
+        return None
+
+    root = np.sqrt(s[..., 0])[..., np.newaxis]
+    u = U[..., :, 0] * root
+    v = Vt[..., 0, :] * root
+    return u.transpose(2, 0, 1), v.transpose(2, 0, 1)
+
+
+def conv_separable(images, kernels, padding=(0, 0), stride=(1, 1),
+                   dilation=(1, 1), groups=1):
+    """
+    Convolves a batch of images with rank-1 kernels in two 1-D passes
+
+    Arguments:
+     - images is a numpy.ndarray of shape (m, h, w, c) containing the images
+     - kernels is a numpy.ndarray of shape (kh, kw, c // groups, nc)
+        containing the kernels, each 2-D slice of which is rank-1
+     - padding is a tuple of (ph, pw) of zeros added on each side
+     - stride is a tuple of (sh, sw) containing the stride
+     - dilation is a tuple of (dh, dw) containing the kernel dilation
+     - groups is the number of groups the channels are split into
+
+    Returns:
+     a numpy.ndarray of shape (m, out_h, out_w, nc) containing the
+        convolved images
+    """
+    kh, kw, cg, nc = kernels.shape
+    factors = rank1_factors(kernels)
+    if factors is None:
+        raise ValueError("kernels are not separable")
+
+    m, h, w, _ = images.shape
+    out_h = (h + 2 * padding[0] - (kh - 1) * dilation[0] - 1) // stride[0] + 1
+    out_w = (w + 2 * padding[1] - (kw - 1) * dilation[1] - 1) // stride[1] + 1
+    output = np.empty((m, out_h, out_w, nc))
+
+    # fixed blocks of images, as in conv_gemm
+    block = block_images(out_h, out_w)
+    for start in range(0, m, block):
+        output[start:start + block] = _separable_block(
+            images[start:start + block], factors, kernels.shape, padding,
+            stride, dilation, groups)
+
+    return output
+
+
+def _separable_block(images, factors, kernels_shape, padding, stride,
+                     dilation, groups):
+    """
+    Computes conv_separable over one block of images
+
+    Arguments:
+     - images is a numpy.ndarray of shape (m, h, w, c) containing the images
+     - factors is the tuple (u, v) returned by rank1_factors
+     - kernels_shape is the shape (kh, kw, c // groups, nc) of the kernels
+     - padding, stride, dilation and groups are as in conv_separable
+
+    Returns:
+     a numpy.ndarray of shape (m, out_h, out_w, nc)
+    """
+    kh, kw, cg, nc = kernels_shape
+    ncg = nc // groups
+    c = cg * groups
+    u, v = factors
+
+    # pass along the width on every padded row, one GEMM per channel:
+    # (c, M, kw) @ (c, kw, ncg)
+    rows = im2col(images, (1, kw), padding, (1, stride[1]), (1, dilation[1]))
+    m, h_p, out_w = rows.shape[:3]
+    rows = rows.reshape(m * h_p * out_w, kw, c).transpose(2, 0, 1)
+    v = v.reshape(kw, cg, groups, ncg).transpose(2, 1, 0, 3)
+    tmp = np.matmul(rows, v.reshape(c, kw, ncg))
+    tmp = tmp.reshape(c, m, h_p, out_w, ncg).transpose(1, 2, 3, 0, 4)
+    tmp = tmp.reshape(m, h_p, out_w, c * ncg)
+
+    # pass along the height, summing the channels of each group
+    cols = im2col(tmp, (kh, 1), (0, 0), (stride[0], 1), (dilation[0], 1))
+    out_h = cols.shape[1]
+    cols = cols.reshape(m * out_h * out_w, kh, groups, cg, ncg)
+    u = u.reshape(kh, cg, groups, ncg).transpose(0, 2, 1, 3)
+    output = np.einsum('Mjgcn,jgcn->Mgn', cols, u)
+
+    return output.reshape(m, out_h, out_w, nc)
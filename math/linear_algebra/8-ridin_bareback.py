@@ -3,10 +3,28 @@
 """
 This module contains a function mat_mul that multiplies two 2D matrices.
 If the matrices cannot be multiplied, the function returns None.
+
+Three algorithms are available: the naive triple loop, a blocked loop over
+the pre-extracted columns of mat2, and Strassen's recursive algorithm,
+which replaces 8 half-size products with 7 and falls back on the blocked
+loop once a dimension is at most the crossover size. strassen_crossover
+measures the size from which Strassen pays off on the host machine.
 """
+from operator import add, sub
+import random
+import time
+matrix = __import__('matrix')
+
+
+# dimension below which Strassen multiplies with the blocked loop
+CROSSOVER = 128
 
+# columns of mat2 multiplied against every row of mat1 at once
+BLOCK_SIZE = matrix.BLOCK_SIZE
 
-def mat_mul(mat1, mat2):
+
+def mat_mul(mat1, mat2, algorithm='naive', crossover=CROSSOVER,
+            block_size=BLOCK_SIZE):
     """
     Multiplies two matrices mat1 and mat2 and returns the resulting matrix.
     If the matrices cannot be multiplied, returns None.
@@ -14,16 +32,141 @@ def mat_mul(mat1, mat2):
     Args:
     mat1 (list of lists): The first matrix.
     mat2 (list of lists): The second matrix.
+    algorithm (str): 'naive', 'blocked', or 'strassen'. 'naive' and
+        'blocked' add the terms of every entry in the same order, so they
+        return identical results; Strassen rounds floats differently.
+    crossover (int): For 'strassen', the dimension at or below which the
+        blocked loop takes over from the recursion.
+    block_size (int): For 'blocked' and 'strassen', the number of columns
+        of mat2 multiplied against every row of mat1 at once.
 
     Returns:
     list of lists: The result of multiplying mat1 by mat2.
     None: If the matrices cannot be multiplied.
     """
+    if algorithm not in ('naive', 'blocked', 'strassen'):
+        raise ValueError("algorithm must be 'naive', 'blocked' or 'strassen'")
     if len(mat1[0]) != len(mat2):
         return None
 
+    if algorithm == 'blocked':
+        return _blocked(mat1, mat2, block_size)
+    if algorithm == 'strassen':
+        return _strassen(mat1, mat2, max(crossover, 1), block_size)
+
+    # Transpose mat2 once instead of once per row of mat1
+    cols = list(zip(*mat2))
     result = [
-        [sum(a * b for a, b in zip(row, col)) for col in zip(*mat2)]
+        [sum(a * b for a, b in zip(row, col)) for col in cols]
         for row in mat1
     ]
     return result
+
+
+def strassen_crossover(sizes=(32, 64, 128, 256, 512), repeat=3,
+                       block_size=BLOCK_SIZE):
+    """
+    Measures the matrix size from which one level of Strassen recursion is
+    faster than the blocked loop on this machine.
+
+    Args:
+    sizes (tuple of int): Increasing sizes of the random square matrices.
+    repeat (int): Number of timings kept at best for each size.
+    block_size (int): Block size of the blocked loop.
+
+    Returns:
+    tuple: The crossover to pass to mat_mul, i.e. half the smallest size
+    from which Strassen won at every larger size (None if it did not win
+    at the largest one), and the list of (size, blocked seconds, strassen
+    seconds) timings.
+    """
+    rng = random.Random(0)
+    timings = []
+    crossover = None
+    for n in sizes:
+        a = [[rng.random() for _ in range(n)] for _ in range(n)]
+        b = [[rng.random() for _ in range(n)] for _ in range(n)]
+        blocked = _best_time(
+            lambda: _blocked(a, b, block_size), repeat)
+        strassen = _best_time(
+            lambda: _strassen(a, b, n - 1, block_size), repeat)
+        timings.append((n, blocked, strassen))
+        if strassen >= blocked:
+            crossover = None
+        elif crossover is None:
+            crossover = n // 2
+    return crossover, timings
+
+
+def _best_time(fn, repeat):
+    """Returns the shortest of repeat timings of fn()."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _blocked(mat1, mat2, block_size):
+    """
+    Multiplies mat1 by mat2 one block of block_size columns of mat2 at a
+    time, with the blocked kernel of matrix.py.
+    """
+    cols = [list(col) for col in zip(*mat2)]
+    return matrix.blocked_product(mat1, cols, block_size)
+
+
+def _strassen(a, b, crossover, block_size):
+    """
+    Multiplies a (n x m) by b (m x p) by Strassen's algorithm, padding odd
+    dimensions with a zero row or column at each level of the recursion.
+    """
+    n, m, p = len(a), len(b), len(b[0])
+    if min(n, m, p) <= crossover:
+        return _blocked(a, b, block_size)
+
+    h, k, q = (n + 1) // 2, (m + 1) // 2, (p + 1) // 2
+    a11, a12, a21, a22 = _quadrants(a, h, k)
+    b11, b12, b21, b22 = _quadrants(b, k, q)
+
+    m1 = _strassen(_add(a11, a22), _add(b11, b22), crossover, block_size)
+    m2 = _strassen(_add(a21, a22), b11, crossover, block_size)
+    m3 = _strassen(a11, _sub(b12, b22), crossover, block_size)
+    m4 = _strassen(a22, _sub(b21, b11), crossover, block_size)
+    m5 = _strassen(_add(a11, a12), b22, crossover, block_size)
+    m6 = _strassen(_sub(a21, a11), _add(b11, b12), crossover, block_size)
+    m7 = _strassen(_sub(a12, a22), _add(b21, b22), crossover, block_size)
+
+    c11 = _add(_sub(_add(m1, m4), m5), m7)
+    c12 = _add(m3, m5)
+    c21 = _add(m2, m4)
+    c22 = _add(_add(_sub(m1, m2), m3), m6)
+
+    # Drop the padding
+    top = [r1 + r2[:p - q] for r1, r2 in zip(c11, c12)]
+    bottom = [r1 + r2[:p - q] for r1, r2 in zip(c21, c22)][:n - h]
+    return top + bottom
+
+
+def _quadrants(mat, h, k):
+    """
+    Splits mat into its four h x k quadrants, padding the bottom and right
+    ones with zeros.
+    """
+    zeros = [0] * (2 * k - len(mat[0]))
+    rows = [row + zeros for row in mat]
+    rows += [[0] * (2 * k)] * (2 * h - len(mat))
+    top, bottom = rows[:h], rows[h:]
+    return ([row[:k] for row in top], [row[k:] for row in top],
+            [row[:k] for row in bottom], [row[k:] for row in bottom])
+
+
+def _add(mat1, mat2):
+    """Adds two matrices of the same shape."""
+    return [list(map(add, r1, r2)) for r1, r2 in zip(mat1, mat2)]
+
+
+def _sub(mat1, mat2):
+    """Subtracts two matrices of the same shape."""
+    return [list(map(sub, r1, r2)) for r1, r2 in zip(mat1, mat2)]
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+This module provides a compact 2D matrix type for machines without NumPy.
+
+A Matrix stores its entries as C doubles in a single row-major
+array('d') instead of a list of lists of boxed floats. Its methods mirror
+the list-of-lists functions of this directory (add_matrices2D,
+cat_matrices2D, matrix_transpose and mat_mul), the first three working in
+place. A Matrix indexes and iterates like a list of rows, so that
+matrix_transpose, add_matrices2D and mat_mul also accept it; the other
+functions of this directory need tolist() first. Rows are returned as
+array('d') copies, so m[i][j] = x leaves the matrix unchanged: entries are
+read and written as m[i, j].
+"""
+from array import array
+from operator import add, mul
+
+# columns of the right operand multiplied against every row at once
+BLOCK_SIZE = 64
+
+
+class Matrix:
+    """
+    A 2D matrix of floats stored row-major in an array('d').
+
+    Attributes:
+        rows (int): The number of rows.
+        cols (int): The number of columns.
+        data (array): The rows * cols entries, row after row.
+    """
+
+    __slots__ = ('rows', 'cols', 'data')
+
+    def __init__(self, rows, cols, data=None):
+        """
+        Creates a rows x cols matrix from its row-major entries.
+
+        Args:
+            rows (int): The number of rows.
+            cols (int): The number of columns.
+            data (iterable): The rows * cols entries, row after row;
+                zeros by default.
+        """
+        if data is None:
+            data = array('d', bytes(8 * rows * cols))
+        elif not isinstance(data, array) or data.typecode != 'd':
+            data = array('d', data)
+        if len(data) != rows * cols:
+            raise ValueError("data must hold rows * cols entries")
+        self.rows = rows
+        self.cols = cols
+        self.data = data
+
+    @classmethod
+    def from_list(cls, matrix):
+        """
+        Creates a Matrix from a list of lists (or from another Matrix).
+
+        Args:
+            matrix (list of lists of int/float): The rows of the matrix.
+
+        Returns:
+            Matrix: A new matrix holding a copy of the entries.
+        """
+        if isinstance(matrix, Matrix):
+            return cls(matrix.rows, matrix.cols, array('d', matrix.data))
+        rows = len(matrix)
+        cols = len(matrix[0]) if rows else 0
+        data = array('d')
+        for row in matrix:
+            if len(row) != cols:
+                raise ValueError("matrix rows must all have the same length")
+            data.extend(row)
+        return cls(rows, cols, data)
+
+    def tolist(self):
+        """
+        Returns the matrix as a list of lists of floats.
+        """
+        return [row.tolist() for row in self]
+
+    @property
+    def shape(self):
+        """The (rows, cols) shape of the matrix."""
+        return self.rows, self.cols
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, i):
+        """
+        Returns a copy of row i as an array('d'), like a list of rows,
+        or the entry at m[i, j].
+        """
+        if isinstance(i, tuple):
+            return self.data[self._index(*i)]
+        i = self._row(i)
+        return self.data[i * self.cols:(i + 1) * self.cols]
+
+    def __setitem__(self, index, value):
+        """Sets the entry at m[i, j]."""
+        if not isinstance(index, tuple):
+            raise TypeError("entries are set as m[i, j]")
+        self.data[self._index(*index)] = value
+
+    def _row(self, i):
+        """Returns the row index i, counted from the end when negative."""
+        if i < 0:
+            i += self.rows
+        if not 0 <= i < self.rows:
+            raise IndexError("row index out of range")
+        return i
+
+    def _index(self, i, j):
+        """Returns the position of the entry (i, j) in data."""
+        if j < 0:
+            j += self.cols
+        if not 0 <= j < self.cols:
+            raise IndexError("column index out of range")
+        return self._row(i) * self.cols + j
+
+    def __iter__(self):
+        data, cols = self.data, self.cols
+        for i in range(self.rows):
+            yield data[i * cols:(i + 1) * cols]
+
+    def __eq__(self, other):
+        if isinstance(other, Matrix):
+            return self.shape == other.shape and self.data == other.data
+        if isinstance(other, list):
+            return self.tolist() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return "Matrix({})".format(self.tolist())
+
+    def columns(self):
+        """
+        Returns the columns of the matrix as a list of array('d').
+        """
+        data, cols = self.data, self.cols
+        return [data[j::cols] for j in range(cols)]
+
+    def add_matrices2D(self, other):
+        """
+        Adds other to the matrix element-wise, in place.
+
+        Args:
+            other (Matrix or list of lists): A matrix of the same shape.
+
+        Returns:
+            Matrix: self, or None if the matrices are not the same shape.
+        """
+        other = _as_matrix(other)
+        if self.shape != other.shape:
+            return None
+        data = self.data
+        data[:] = array('d', map(add, data, other.data))
+        return self
+
+    def cat_matrices2D(self, other, axis=0):
+        """
+        Concatenates other to the matrix along axis, in place.
+
+        Args:
+            other (Matrix or list of lists): The matrix to append.
+            axis (int, optional): The axis to concatenate on (0 for rows, 1
+                for columns).
+
+        Returns:
+            Matrix: self, or None if the shapes are incompatible.
+        """
+        other = _as_matrix(other)
+        if axis == 0 and self.cols == other.cols:
+            self.data.extend(other.data)
+            self.rows += other.rows
+            return self
+        if axis == 1 and self.rows == other.rows:
+            data = array('d')
+            for row, other_row in zip(self, other):
+                data.extend(row)
+                data.extend(other_row)
+            self.data = data
+            self.cols += other.cols
+            return self
+        return None
+
+    def matrix_transpose(self):
+        """
+        Transposes the matrix in place.
+
+        Returns:
+            Matrix: self.
+        """
+        data = array('d')
+        for column in self.columns():
+            data.extend(column)
+        self.data = data
+        self.rows, self.cols = self.cols, self.rows
+        return self
+
+    def mat_mul(self, other, block_size=None):
+        """
+        Multiplies the matrix by other.
+
+        The rows and the columns of other are unpacked once to lists of
+        floats, which map() walks faster than arrays, and multiplied by
+        blocked_product. The dot products add their terms in the same order
+        as mat_mul, so the results are identical.
+
+        Args:
+            other (Matrix or list of lists): The right operand.
+            block_size (int, optional): The number of columns of other per
+                block; BLOCK_SIZE by default.
+
+        Returns:
+            Matrix: The product, or None if the matrices cannot be
+            multiplied.
+        """
+        other = _as_matrix(other)
+        if self.cols != other.rows:
+            return None
+
+        rows = [row.tolist() for row in self]
+        columns = [column.tolist() for column in other.columns()]
+        data = array('d')
+        for row in blocked_product(rows, columns, block_size or BLOCK_SIZE):
+            data.extend(row)
+        return Matrix(self.rows, other.cols, data)
+
+
+def blocked_product(rows, columns, block_size=BLOCK_SIZE):
+    """
+    Multiplies a matrix given by its rows with one given by its columns.
+
+    The columns are visited in blocks of block_size columns, each block
+    being multiplied against every row before moving on to the next one so
+    that it stays in cache. Every entry adds its terms in order, as the
+    naive triple loop does, so integers stay exact.
+
+    Args:
+        rows (list of lists): The rows of the left operand.
+        columns (list of lists): The columns of the right operand.
+        block_size (int, optional): The number of columns per block.
+
+    Returns:
+        list of lists: The rows of the product.
+    """
+    result = [[] for _ in rows]
+    for j in range(0, len(columns), block_size):
+        block = columns[j:j + block_size]
+        for row, out in zip(rows, result):
+            out.extend([sum(map(mul, row, column)) for column in block])
+    return result
+
+
+def _as_matrix(matrix):
+    """Returns matrix as a Matrix, converting a list of lists."""
+    if isinstance(matrix, Matrix):
+        return matrix
+    return Matrix.from_list(matrix)
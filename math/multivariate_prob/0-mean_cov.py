@@ -1,47 +1,144 @@
 #!/usr/bin/env python3
+import collections
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 
 """
 This module contains a function to calculate the mean and covariance of a dataset.
+
+Datasets too large for a centered copy, such as a numpy.memmap or an iterator
+of row blocks, are summarized block by block: each block gives its count, mean
+and centered cross-product matrix, and the summaries are merged with Chan's
+pairwise formulas, optionally computing the blocks in worker threads.
 """
 
-def mean_cov(X):
+# rows summarized at once when the dataset is chunked
+CHUNK_ROWS = 1 << 14
+
+
+def mean_cov(X, chunk_size=None, workers=None):
     """
     Calculates the mean and covariance of a dataset.
-    
+
     Args:
     X (numpy.ndarray): A 2D numpy array of shape (n, d) where n is the number
                         of data points, and d is the number of dimensions.
+                        It may also be a numpy.memmap, or an iterable of
+                        2D row blocks of shape (n_i, d).
+    chunk_size (int): Number of rows summarized at once when X is an array;
+                      by default CHUNK_ROWS for a numpy.memmap or when workers
+                      is given, and the whole array otherwise. Iterables are
+                      summarized block by block as they come.
+    workers (int): Number of threads summarizing blocks concurrently (numpy
+                   releases the GIL in the matrix products). The summaries are
+                   merged in row order, so the result does not depend on it.
 
     Returns:
     tuple: A tuple containing:
-        - mean (numpy.ndarray): A 1D numpy array of shape (d,) containing the mean of the dataset.
-        - cov (numpy.ndarray): A 2D numpy array of shape (d, d) containing the covariance matrix of the dataset.
-    
+        - mean (numpy.ndarray): A 2D numpy array of shape (1, d)
+          containing the mean of the dataset.
+        - cov (numpy.ndarray): A 2D numpy array of shape (d, d)
+          containing the covariance matrix of the dataset, which can be
+          passed on to correlation.
+
     Raises:
     TypeError: If X is not a 2D numpy array.
     ValueError: If X has fewer than 2 data points.
     """
-    
-    # Check if X is a 2D numpy array
-    if not isinstance(X, np.ndarray) or len(X.shape) != 2:
-        raise TypeError("X must be a 2D numpy.ndarray")
-    
-    # Get the number of data points (n) and dimensions (d)
-    n, d = X.shape
-    
-    # Check if the dataset has at least two data points
+
+    if isinstance(X, np.ndarray):
+        # Check if X is a 2D numpy array
+        if len(X.shape) != 2:
+            raise TypeError("X must be a 2D numpy.ndarray")
+
+        # Get the number of data points (n) and dimensions (d)
+        n, d = X.shape
+
+        # Check if the dataset has at least two data points
+        if n < 2:
+            raise ValueError("X must contain multiple data points")
+
+        if chunk_size is None and workers is None and \
+                not isinstance(X, np.memmap):
+            # Calculate the mean of the dataset
+            mean = np.mean(X, axis=0).reshape(1, -1)
+
+            # Calculate the covariance matrix manually
+            # Subtract the mean from each data point
+            X_centered = X - mean
+
+            # Calculate the covariance matrix:
+            # (1/(n-1)) * (X_centered.T @ X_centered)
+            cov = np.dot(X_centered.T, X_centered) / (n - 1)
+
+            return mean, cov
+
+        size = chunk_size or CHUNK_ROWS
+        blocks = (X[i:i + size] for i in range(0, n, size))
+    else:
+        try:
+            blocks = iter(X)
+        except TypeError:
+            raise TypeError("X must be a 2D numpy.ndarray")
+
+    n, mean, m2 = _reduce(blocks, workers)
     if n < 2:
         raise ValueError("X must contain multiple data points")
-    
-    # Calculate the mean of the dataset
-    mean = np.mean(X, axis=0).reshape(1, -1)
-    
-    # Calculate the covariance matrix manually
-    # Subtract the mean from each data point
-    X_centered = X - mean
-    
-    # Calculate the covariance matrix: (1/(n-1)) * (X_centered.T @ X_centered)
-    cov = np.dot(X_centered.T, X_centered) / (n - 1)
-    
-    return mean, cov
+
+    return mean.reshape(1, -1), m2 / (n - 1)
+
+
+def _summary(block):
+    """
+    Returns the count, mean and centered cross-product matrix of a block of
+    rows, or None for an empty block.
+    """
+    try:
+        block = np.asarray(block, dtype=float)
+    except (TypeError, ValueError):
+        raise TypeError("X must be a 2D numpy.ndarray")
+    if block.ndim != 2:
+        raise TypeError("X must be a 2D numpy.ndarray")
+    if block.shape[0] == 0:
+        return None
+    mean = block.mean(axis=0)
+    centered = block - mean
+    return block.shape[0], mean, np.dot(centered.T, centered)
+
+
+def _merge(a, b):
+    """
+    Merges two block summaries with Chan's pairwise formulas.
+    """
+    if a is None or b is None:
+        return a if b is None else b
+    n_a, mean_a, m2_a = a
+    n_b, mean_b, m2_b = b
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    mean = mean_a + delta * (n_b / n)
+    m2 = m2_a + m2_b + np.outer(delta, delta) * (n_a * n_b / n)
+    return n, mean, m2
+
+
+def _reduce(blocks, workers=None):
+    """
+    Summarizes and merges blocks of rows in order, computing the summaries
+    of up to 2 * workers blocks ahead in a thread pool.
+
+    Returns the count, mean and centered cross-product matrix of all rows.
+    """
+    total = None
+    if workers is None or workers <= 1:
+        for block in blocks:
+            total = _merge(total, _summary(block))
+    else:
+        with ThreadPoolExecutor(workers) as executor:
+            pending = collections.deque()
+            for block in blocks:
+                pending.append(executor.submit(_summary, block))
+                if len(pending) >= 2 * workers:
+                    total = _merge(total, pending.popleft().result())
+            while pending:
+                total = _merge(total, pending.popleft().result())
+    return total or (0, None, None)
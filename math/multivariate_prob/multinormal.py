@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 import numpy as np
+from scipy.linalg import solve_triangular
+mean_cov = __import__('0-mean_cov')
 
 class MultiNormal:
     """
@@ -11,7 +13,9 @@ class MultiNormal:
 
     Methods:
         __init__(self, data): Initializes the MultiNormal instance using the provided data.
-        pdf(self, x): Calculates the PDF at the given data point x.
+        pdf(self, x): Calculates the PDF at the given data points x.
+        logpdf(self, x): Calculates the log of the PDF at the given data
+            points x.
     """
 
     def __init__(self, data):
@@ -34,35 +38,72 @@ class MultiNormal:
         if n < 2:
             raise ValueError("data must contain multiple data points")
         
-        self.mean = np.mean(data, axis=1).reshape(d, 1)
-        data_centered = data - self.mean
-        self.cov = np.dot(data_centered, data_centered.T) / (n - 1)
+        # Summarize the data points in blocks rather than centering a copy
+        mean, self.cov = mean_cov.mean_cov(data.T,
+                                           chunk_size=mean_cov.CHUNK_ROWS)
+        self.mean = mean.reshape(d, 1)
 
     def pdf(self, x):
         """
-        Calculates the PDF of the multivariate normal distribution at a data point x.
+        Calculates the PDF of the multivariate normal distribution at data
+        points x.
 
         Args:
-            x (numpy.ndarray): A 2D array of shape (d, 1) representing the data point.
+            x (numpy.ndarray): A 2D array of shape (d, 1) representing the
+                               data point, or of shape (d, n) holding n data
+                               points as columns.
 
         Raises:
             TypeError: If x is not a numpy.ndarray.
-            ValueError: If x does not have the shape (d, 1).
+            ValueError: If x does not have the shape (d, 1) or (d, n).
 
         Returns:
-            float: The value of the PDF at x.
+            numpy.ndarray: The values of the PDF at x, of shape (1, n).
+        """
+        return np.exp(self.logpdf(x))
+
+    def logpdf(self, x):
+        """
+        Calculates the log of the PDF at data points x.
+
+        The points are whitened all at once by one triangular solve with
+        the cached Cholesky factor L of the covariance (cov = L L^T), so
+        that the Mahalanobis distances are the squared norms of the columns
+        of z, where L z = x - mean.
+
+        Args:
+            x (numpy.ndarray): A 2D array of shape (d, n) holding n data
+                               points as columns.
+
+        Raises:
+            TypeError: If x is not a numpy.ndarray.
+            ValueError: If x does not have the shape (d, 1) or (d, n).
+
+        Returns:
+            numpy.ndarray: The values of the log PDF at x, of shape (1, n).
         """
         if not isinstance(x, np.ndarray):
             raise TypeError("x must be a numpy.ndarray")
-        
+
         d, _ = self.mean.shape
-        if x.shape != (d, 1):
+        if x.ndim != 2 or x.shape[0] != d:
             raise ValueError("x must have the shape ({}, 1)".format(d))
 
-        # Calculate the PDF
-        diff = x - self.mean
-        cov_inv = np.linalg.inv(self.cov)
-        exponent = -0.5 * np.dot(np.dot(diff.T, cov_inv), diff)
-        norm_const = 1 / np.sqrt((2 * np.pi) ** d * np.linalg.det(self.cov))
-        
-        return norm_const * np.exp(exponent)
+        L, logdet = self._factor()
+        z = solve_triangular(L, x - self.mean, lower=True)
+        mahalanobis = np.sum(z * z, axis=0, keepdims=True)
+        return -0.5 * (d * np.log(2 * np.pi) + logdet + mahalanobis)
+
+    def _factor(self):
+        """
+        Returns the lower Cholesky factor of cov and the log of the
+        determinant of cov, computed once and cached until cov changes,
+        whether it is reassigned or modified in place.
+        """
+        cache = getattr(self, '_cache', None)
+        if cache is None or not np.array_equal(cache[0], self.cov):
+            L = np.linalg.cholesky(self.cov)
+            logdet = 2 * np.sum(np.log(np.diagonal(L)))
+            cache = (self.cov.copy(), L, logdet)
+            self._cache = cache
+        return cache[1], cache[2]
@@ -4,11 +4,18 @@
 This module contains the Binomial class, which represents a
 binomial distribution. It can estimate parameters from data and
 compute the probability mass function (PMF) and cumulative
-distribution function (CDF).
+distribution function (CDF). The parameters can also be estimated
+in a single pass over streamed data with from_stream, partial_fit
+and merge, and sample draws random variates.
 """
+import math
+import numpy as np
+log_factorial = __import__('special').log_factorial
+moments = __import__('moments')
+as_generator = __import__('sampling').as_generator
 
 
-class Binomial:
+class Binomial(moments.StreamingEstimator):
     """
     Class that represents a binomial distribution.
     """
@@ -30,6 +37,7 @@ class Binomial:
             TypeError: If data is not a list.
             ValueError: If data has fewer than two elements.
         """
+        self.moments = moments.Moments()
         if data is None:
             if n <= 0:
                 raise ValueError("n must be a positive value")
@@ -45,16 +53,26 @@ class Binomial:
             if len(data) < 2:
                 raise ValueError("data must contain multiple values")
 
-            p_est = sum(data) / len(data) / max(data)
-            n_est = round(len(data) / p_est)
+            self.partial_fit(data)
 
-            if not (0 < p_est < 1):
-                raise ValueError(
-                    "p must be greater than 0 and less than 1"
-                )
+    def _estimate(self):
+        """
+        Sets n and p from the data seen so far.
 
-            self.p = p_est
-            self.n = n_est
+        Raises:
+            ValueError: If the estimated p is invalid.
+        """
+        data = self.moments
+        p_est = data.mean / data.max
+        n_est = round(data.count / p_est)
+
+        if not (0 < p_est < 1):
+            raise ValueError(
+                "p must be greater than 0 and less than 1"
+            )
+
+        self.p = p_est
+        self.n = n_est
 
     def factorial(self, num):
         """
@@ -76,44 +94,66 @@ class Binomial:
     def pmf(self, k):
         """
         Computes the probability mass function (PMF) for k
-        successes.
+        successes, in log space.
 
         Args:
-            k (int): Number of successes.
+            k (int or array-like): Number(s) of successes.
 
         Returns:
-            float: PMF value for k.
+            float or numpy.ndarray: PMF value(s) for k.
         """
-        k = int(k)
-
-        if k < 0 or k > self.n:
-            return 0
-
-        comb = (
-            self.factorial(self.n)
-            // (self.factorial(k) * self.factorial(self.n - k))
-        )
-
-        pmf_value = comb * (self.p ** k) * ((1 - self.p) ** (self.n - k))
-        return pmf_value
+        k = np.trunc(np.asarray(k, dtype=float))
+        inside = (k >= 0) & (k <= self.n)
+        pmf_value = np.where(
+            inside, np.exp(self._log_pmf(np.where(inside, k, 0))), 0.)
+        return pmf_value if pmf_value.ndim else float(pmf_value)
 
     def cdf(self, k):
         """
         Computes the cumulative distribution function (CDF) for k
-        successes.
+        successes, as the running sum of the PMF up to the largest k.
 
         Args:
-            k (int): Number of successes.
+            k (int or array-like): Number(s) of successes.
 
         Returns:
-            float: CDF value for k.
+            float or numpy.ndarray: CDF value(s) for k.
         """
-        k = int(k)
+        k = np.trunc(np.asarray(k, dtype=float))
+        if k.size == 0:
+            return np.zeros(k.shape)
+        above = k > self.n
+        inside = (k >= 0) & ~above
+        k = np.where(inside, k, 0).astype(int)
+
+        cumulative = np.cumsum(np.exp(self._log_pmf(np.arange(k.max() + 1))))
+        cdf_value = np.where(inside, cumulative[k], np.where(above, 1., 0.))
+        return cdf_value if cdf_value.ndim else float(cdf_value)
+
+    def sample(self, size=None, rng=None):
+        """
+        Draws random numbers of successes.
 
-        if k < 0:
-            return 0
-        if k > self.n:
-            return 1
+        numpy draws by inversion when n * min(p, 1 - p) is small and with
+        the BTPE rejection algorithm otherwise.
 
-        cdf_value = sum(self.pmf(i) for i in range(k + 1))
-        return cdf_value
+        Args:
+            size (int or tuple, optional): Shape of the sample; a single
+                int by default.
+            rng (optional): None, an int seed, a numpy.random.SeedSequence
+                or a numpy.random.Generator (see sampling.spawn to draw in
+                parallel).
+
+        Returns:
+            int or numpy.ndarray: The sample.
+        """
+        sample = as_generator(rng).binomial(self.n, self.p, size)
+        return sample if np.ndim(sample) else int(sample)
+
+    def _log_pmf(self, k):
+        """Computes the log of the PMF for integers 0 <= k <= n."""
+        k = np.asarray(k, dtype=np.int64)
+        log_comb = log_factorial(self.n) - log_factorial(k) - \
+            log_factorial(self.n - k)
+        return log_comb + k * math.log(self.p) + \
+            (self.n - k) * math.log1p(-self.p)
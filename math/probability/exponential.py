@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
 
 """Module for Exponential distribution."""
+import numpy as np
+moments = __import__('moments')
+as_generator = __import__('sampling').as_generator
 
 
-class Exponential:
-    """Represents an exponential distribution."""
+class Exponential(moments.StreamingEstimator):
+    """Represents an exponential distribution.
+
+    lambtha can also be estimated in a single pass over streamed data with
+    from_stream, partial_fit and merge, and sample draws random variates.
+    """
 
     def __init__(self, data=None, lambtha=1.):
         """Initializes the Exponential distribution.
@@ -19,6 +26,7 @@ class Exponential:
             TypeError: If data is not a list.
             ValueError: If data does not contain multiple values.
         """
+        self.moments = moments.Moments()
         if data is None:
             if lambtha <= 0:
                 raise ValueError("lambtha must be a positive value")
@@ -28,32 +36,62 @@ class Exponential:
                 raise TypeError("data must be a list")
             if len(data) < 2:
                 raise ValueError("data must contain multiple values")
-            self.lambtha = float(1 / (sum(data) / len(data)))
+            self.partial_fit(data)
+
+    def _estimate(self):
+        """Sets lambtha to the inverse of the mean of the data seen so far.
+
+        Raises:
+            ValueError: If the mean is not positive.
+        """
+        if self.moments.mean <= 0:
+            raise ValueError("lambtha must be a positive value")
+        self.lambtha = float(1 / self.moments.mean)
 
     def pdf(self, x):
         """Calculates the probability density function (PDF) for a given
  time period x.
 
         Args:
-            x (float): The time period.
+            x (float or array-like): The time period(s).
 
         Returns:
-            float: The PDF value for x.
+            float or numpy.ndarray: The PDF value(s) for x.
         """
-        if x < 0:
-            return 0
-        return self.lambtha * (2.7182818285 ** (-self.lambtha * x))
+        x = np.asarray(x, dtype=float)
+        pdf_value = np.where(
+            x < 0, 0., self.lambtha * np.exp(-self.lambtha * np.abs(x)))
+        return pdf_value if pdf_value.ndim else float(pdf_value)
 
     def cdf(self, x):
         """Calculates the cumulative distribution function (CDF) for a given
  time period x.
 
         Args:
-            x (float): The time period.
+            x (float or array-like): The time period(s).
+
+        Returns:
+            float or numpy.ndarray: The CDF value(s) for x.
+        """
+        x = np.asarray(x, dtype=float)
+        cdf_value = np.where(
+            x < 0, 0., -np.expm1(-self.lambtha * np.abs(x)))
+        return cdf_value if cdf_value.ndim else float(cdf_value)
+
+    def sample(self, size=None, rng=None):
+        """Draws random time periods by inverting the CDF of uniform draws.
+
+        Args:
+            size (int or tuple, optional): Shape of the sample; a single
+                float by default.
+            rng (optional): None, an int seed, a numpy.random.SeedSequence
+                or a numpy.random.Generator (see sampling.spawn to draw in
+                parallel).
 
         Returns:
-            float: The CDF value for x.
+            float or numpy.ndarray: The sample.
         """
-        if x < 0:
-            return 0
-        return 1 - (2.7182818285 ** (-self.lambtha * x))
+        rng = as_generator(rng)
+        # x = -log(1 - u) / lambtha solves cdf(x) = u
+        sample = -np.log1p(-rng.random(size)) / self.lambtha
+        return sample if np.ndim(sample) else float(sample)
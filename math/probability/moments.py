@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+This module contains the single-pass accumulators used to fit the
+distribution classes from data that does not fit in a list.
+
+Moments keeps the count, mean, sum of squared deviations and extrema of
+everything it has seen, updating them chunk by chunk with the pairwise
+formulas of Chan et al. (the chunk-wise form of Welford's algorithm), so
+that two accumulators fitted on separate shards can also be merged.
+StreamingEstimator builds from_stream, partial_fit and merge on top of it
+for a class that re-estimates its parameters from a Moments.
+"""
+import abc
+import numbers
+import numpy as np
+
+
+# number of values summarized at once; bounds the temporary arrays
+CHUNK_SIZE = 1 << 16
+
+
+class Moments:
+    """
+    Running count, mean, sum of squared deviations, minimum and maximum.
+
+    Attributes:
+        count (int): Number of values seen.
+        mean (float): Mean of the values.
+        m2 (float): Sum of the squared deviations from the mean.
+        min (float): Smallest value.
+        max (float): Largest value.
+    """
+
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self):
+        """Initializes an empty accumulator."""
+        self.count = 0
+        self.mean = 0.
+        self.m2 = 0.
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def copy(self):
+        """Returns an independent copy of the accumulator."""
+        other = Moments()
+        for name in self.__slots__:
+            setattr(other, name, getattr(self, name))
+        return other
+
+    @property
+    def variance(self):
+        """The population variance of the values."""
+        return self.m2 / self.count if self.count else 0.
+
+    def update(self, values):
+        """
+        Adds values to the accumulator.
+
+        Args:
+            values (array-like): Values of any shape, e.g. a list, a numpy
+                array or a numpy.memmap, read CHUNK_SIZE values at a time.
+
+        Returns:
+            Moments: self.
+        """
+        values = np.asarray(values).reshape(-1)
+        for start in range(0, values.size, CHUNK_SIZE):
+            chunk = np.asarray(values[start:start + CHUNK_SIZE], dtype=float)
+            mean = chunk.mean()
+            self._combine(chunk.size, mean, np.sum((chunk - mean) ** 2),
+                          chunk.min(), chunk.max())
+        return self
+
+    def merge(self, other):
+        """
+        Adds everything another accumulator has seen to this one.
+
+        Args:
+            other (Moments): The accumulator to merge.
+
+        Returns:
+            Moments: self.
+        """
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.min,
+                          other.max)
+        return self
+
+    def _combine(self, count, mean, m2, low, high):
+        """Merges the statistics of a batch into the accumulator."""
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, float(low))
+        self.max = max(self.max, float(high))
+
+
+class StreamingEstimator(abc.ABC):
+    """
+    Mixin fitting a distribution in a single pass over streamed data.
+
+    Subclasses keep their data summary in self.moments and implement
+    _estimate, which sets the parameters of the distribution from it.
+    """
+
+    @classmethod
+    def from_stream(cls, iterable, chunk_size=CHUNK_SIZE):
+        """
+        Fits a distribution to streamed data.
+
+        Args:
+            iterable: Numbers, array-like chunks of numbers, or a mix of
+                both, e.g. a generator, a list or a numpy.memmap.
+            chunk_size (int): Number of loose numbers buffered before they
+                are summarized together.
+
+        The parameters are estimated, and validated, once the stream is
+        exhausted, so a prefix of the data need not give valid parameters.
+
+        Raises:
+            ValueError: If the data does not contain multiple values.
+
+        Returns:
+            The fitted distribution.
+        """
+        estimator = cls()
+        summary = estimator.moments
+        if isinstance(iterable, np.ndarray):
+            summary.update(iterable)
+        else:
+            buffer = []
+            for item in iterable:
+                if isinstance(item, numbers.Number):
+                    buffer.append(item)
+                    if len(buffer) < chunk_size:
+                        continue
+                    item, buffer = buffer, []
+                summary.update(item)
+            summary.update(buffer)
+        if summary.count < 2:
+            raise ValueError("data must contain multiple values")
+        estimator._estimate()
+        return estimator
+
+    def partial_fit(self, chunk):
+        """
+        Updates the distribution with a chunk of data.
+
+        The parameters are re-estimated from all the data seen so far once
+        it contains multiple values. If the chunk cannot be read or gives
+        invalid parameters, the error is raised and the distribution is
+        left as it was.
+
+        Args:
+            chunk (array-like): The new data.
+
+        Returns:
+            self.
+        """
+        return self._refit(self.moments.copy().update(chunk))
+
+    def merge(self, other):
+        """
+        Updates the distribution with the data another estimator of the
+        same class has seen, e.g. one fitted on another shard.
+
+        As with partial_fit, the distribution is left as it was if the
+        merged data gives invalid parameters.
+
+        Args:
+            other: The estimator to merge.
+
+        Returns:
+            self.
+        """
+        return self._refit(self.moments.copy().merge(other.moments))
+
+    def _refit(self, summary):
+        """
+        Replaces self.moments with summary and re-estimates the parameters
+        from it, restoring the previous state if _estimate raises.
+        """
+        state = dict(vars(self))
+        self.moments = summary
+        try:
+            if summary.count >= 2:
+                self._estimate()
+        except Exception:
+            vars(self).clear()
+            vars(self).update(state)
+            raise
+        return self
+
+    @abc.abstractmethod
+    def _estimate(self):
+        """Sets the parameters of the distribution from self.moments."""
@@ -3,12 +3,21 @@
 Normal Distribution Class
 
 This module contains the Normal class which represents a normal distribution
-and provides methods to calculate the z-score, x-value, and PDF of
+and provides methods to calculate the z-score, x-value, PDF and CDF of
 the distribution.
+
+pdf and cdf accept scalars, lists or numpy arrays and evaluate arrays in
+bulk. The parameters can also be estimated in a single pass over streamed
+data with from_stream, partial_fit and merge, and sample draws random
+variates.
 """
+import numpy as np
+erf = __import__('special').erf
+moments = __import__('moments')
+as_generator = __import__('sampling').as_generator
 
 
-class Normal:
+class Normal(moments.StreamingEstimator):
     """
     A class that represents a normal distribution.
 
@@ -29,6 +38,12 @@ class Normal:
 
         pdf(self, x):
             Calculates the value of the PDF for a given x-value.
+
+        cdf(self, x):
+            Calculates the value of the CDF for a given x-value.
+
+        sample(self, size=None, rng=None):
+            Draws random values from the distribution.
     """
 
     def __init__(self, data=None, mean=0., stddev=1.):
@@ -51,24 +66,28 @@ class Normal:
             TypeError: If data is not a list.
             ValueError: If data does not contain multiple values.
         """
+        self.moments = moments.Moments()
         if data is not None:
             if not isinstance(data, list):
                 raise TypeError("data must be a list")
             if len(data) < 2:
                 raise ValueError("data must contain multiple values")
 
-            # Calculate mean manually
-            self.mean = sum(data) / len(data)
-
-            # Calculate standard deviation manually
-            variance = sum((x - self.mean) ** 2 for x in data) / len(data)
-            self.stddev = variance ** 0.5
+            # Calculate mean and standard deviation in a single pass
+            self.partial_fit(data)
         else:
             if stddev <= 0:
                 raise ValueError("stddev must be a positive value")
             self.mean = float(mean)
             self.stddev = float(stddev)
 
+    def _estimate(self):
+        """
+        Sets the mean and standard deviation from the data seen so far.
+        """
+        self.mean = float(self.moments.mean)
+        self.stddev = self.moments.variance ** 0.5
+
     def z_score(self, x):
         """
         Calculates the z-score for a given x-value.
@@ -98,50 +117,56 @@ class Normal:
         Calculates the value of the PDF for a given x-value.
 
         Args:
-            x (float): The x-value to calculate the PDF for.
+            x (float or array-like): The x-value(s) to calculate the PDF for.
 
         Returns:
-            float: The PDF value for the given x.
+            float or numpy.ndarray: The PDF value(s) for the given x.
         """
+        x = np.asarray(x, dtype=float)
         # Calculate the exponent term
-        exponent = -0.5 * ((x - self.mean) ** 2) / (self.stddev ** 2)
+        exponent = -0.5 * ((x - self.mean) / self.stddev) ** 2
         # Calculate the normalization factor
-        normalization = 1 / (self.stddev * (2 * 3.141592653589793) ** 0.5)
+        normalization = 1 / (self.stddev * (2 * np.pi) ** 0.5)
         # Return the PDF value
-        return normalization * (2.718281828459045 ** exponent)
+        pdf_value = normalization * np.exp(exponent)
+        return pdf_value if pdf_value.ndim else float(pdf_value)
 
-        def cdf(self, x):
+    def cdf(self, x):
         """
         Calculates the value of the CDF for a given x-value.
 
         Args:
-            x (float): The x-value to calculate the CDF for.
+            x (float or array-like): The x-value(s) to calculate the CDF for.
 
         Returns:
-            float: The CDF value for the given x.
+            float or numpy.ndarray: The CDF value(s) for the given x.
         """
+        x = np.asarray(x, dtype=float)
         # Compute the z-score
         z = (x - self.mean) / (self.stddev * (2 ** 0.5))
 
-        # Constants for the erf approximation
-        a1 = 0.254829592
-        a2 = -0.284496736
-        a3 = 1.421413741
-        a4 = -1.453152027
-        a5 = 1.061405429
-        p = 0.3275911
+        # Compute CDF using erf
+        cdf_value = 0.5 * (1 + erf(z))
 
-        # Approximate erf using numerical methods
-        t = 1 / (1 + p * abs(z))
-        erf_approx = 1 - (a1 * t + a2 * t ** 2 + a3 * t ** 3 +
-                          a4 * t ** 4 + a5 * t ** 5) * (2.718281828459045 ** (-z * z))
+        # Round to match expected precision
+        cdf_value = np.round(cdf_value, 10)
+        return cdf_value if cdf_value.ndim else float(cdf_value)
 
-        # Adjust sign for negative values
-        if z < 0:
-            erf_approx = -erf_approx
+    def sample(self, size=None, rng=None):
+        """
+        Draws random values from the distribution, with numpy's Ziggurat
+        standard normal generator.
 
-        # Compute CDF using erf
-        cdf_value = 0.5 * (1 + erf_approx)
+        Args:
+            size (int or tuple, optional): Shape of the sample; a single
+                float by default.
+            rng (optional): None, an int seed, a numpy.random.SeedSequence
+                or a numpy.random.Generator (see sampling.spawn to draw in
+                parallel).
 
-        # Round to match expected precision
-        return round(cdf_value, 10)
+        Returns:
+            float or numpy.ndarray: The sample.
+        """
+        rng = as_generator(rng)
+        sample = self.mean + self.stddev * rng.standard_normal(size)
+        return sample if np.ndim(sample) else float(sample)
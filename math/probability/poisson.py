@@ -1,11 +1,24 @@
 #!/usr/bin/env python3
 """
 This module defines the Poisson class for modeling a Poisson distribution.
+
+The PMF is evaluated in log space, with log(k!) read from a memoized table,
+so it stays accurate for lambtha in the hundreds and beyond, and the CDF
+is read from a table of running sums of the PMF kept on the instance.
 """
+import math
+import numpy as np
+log_factorial = __import__('special').log_factorial
+moments = __import__('moments')
+as_generator = __import__('sampling').as_generator
+
 
+class Poisson(moments.StreamingEstimator):
+    """Represents a Poisson distribution.
 
-class Poisson:
-    """Represents a Poisson distribution."""
+    lambtha can also be estimated in a single pass over streamed data with
+    from_stream, partial_fit and merge, and sample draws random variates.
+    """
 
     def __init__(self, data=None, lambtha=1.):
         """Initializes the Poisson distribution.
@@ -20,6 +33,7 @@ class Poisson:
             TypeError: If data is not a list.
             ValueError: If data does not contain multiple values.
         """
+        self.moments = moments.Moments()
         if data is None:
             if lambtha <= 0:
                 raise ValueError("lambtha must be a positive value")
@@ -29,47 +43,104 @@ class Poisson:
                 raise TypeError("data must be a list")
             if len(data) < 2:
                 raise ValueError("data must contain multiple values")
-            self.lambtha = float(sum(data) / len(data))
+            self.partial_fit(data)
+
+    def _estimate(self):
+        """Sets lambtha to the mean of the data seen so far."""
+        self.lambtha = float(self.moments.mean)
 
     def factorial(self, n):
-        """Computes factorial of n manually."""
-        if n == 0 or n == 1:
-            return 1
-        result = 1
-        for i in range(2, n + 1):
-            result *= i
-        return result
+        """Computes factorial of n."""
+        return math.factorial(n)
 
     def exp(self, x):
-        """Computes e^(-x) using a Taylor series approximation."""
-        terms = 20  # More terms increase accuracy
-        result = 1.0
-        power = 1.0
-        factorial = 1.0
-        for i in range(1, terms):
-            power *= -x
-            factorial *= i
-            result += power / factorial
-        return result
+        """Computes e^(-x)."""
+        result = np.exp(-np.asarray(x, dtype=float))
+        return result if result.ndim else float(result)
 
     def pmf(self, k):
-        """Calculates the value of the PMF for a given number of “successes”.
+        """Calculates the value of the PMF for a given number of “successes”,
+        in log space.
 
         Args:
-            k (int or float): The number of successes.
+            k (int, float or array-like): The number(s) of successes.
 
         Returns:
-            float: The PMF value for k.
+            float or numpy.ndarray: The PMF value(s) for k.
         """
-        if not isinstance(k, int):
-            k = int(k)  # Convert to integer
+        k = np.trunc(np.asarray(k, dtype=float))  # Convert to integer
+        # Poisson distribution is only defined for k >= 0
+        inside = k >= 0
+        pmf_value = np.where(
+            inside, np.exp(self._log_pmf(np.where(inside, k, 0))), 0.)
+        return pmf_value if pmf_value.ndim else float(pmf_value)
 
-        if k < 0:
-            return 0  # Poisson distribution is only defined for k >= 0
+    def cdf(self, k):
+        """Calculates the value of the CDF for a given number of “successes”,
+        as a running sum of the PMF.
 
-        # Poisson PMF formula: (λ^k * e^(-λ)) / k!
-        lambtha_k = 1
-        for _ in range(k):
-            lambtha_k *= self.lambtha  # Compute lambtha^k manually
+        The running sums are kept in a table that grows (by doubling) to
+        the largest k asked for, and is rebuilt when lambtha changes. The
+        table stops at lambtha + 40 * sqrt(lambtha) + 40, past which the
+        upper tail is below double precision and the CDF is 1.0.
+
+        Args:
+            k (int, float or array-like): The number(s) of successes.
+
+        Returns:
+            float or numpy.ndarray: The CDF value(s) for k.
+        """
+        k = np.trunc(np.asarray(k, dtype=float))
+        if k.size == 0:
+            return np.zeros(k.shape)
+        inside = k >= 0
+        tail = k > self._cdf_limit()
+        k = np.clip(np.where(inside, k, 0), 0, self._cdf_limit()).astype(int)
+
+        cdf_value = np.where(inside, self._cdf_table(k.max())[k], 0.)
+        cdf_value = np.where(tail, 1., cdf_value)
+        return cdf_value if cdf_value.ndim else float(cdf_value)
+
+    def sample(self, size=None, rng=None):
+        """Draws random numbers of successes.
 
-        return (lambtha_k * self.exp(self.lambtha)) / self.factorial(k)
+        numpy draws by inversion for a small lambtha and with the PTRS
+        transformed rejection method from lambtha = 10 on.
+
+        Args:
+            size (int or tuple, optional): Shape of the sample; a single
+                int by default.
+            rng (optional): None, an int seed, a numpy.random.SeedSequence
+                or a numpy.random.Generator (see sampling.spawn to draw in
+                parallel).
+
+        Returns:
+            int or numpy.ndarray: The sample.
+        """
+        sample = as_generator(rng).poisson(self.lambtha, size)
+        return sample if np.ndim(sample) else int(sample)
+
+    def _cdf_table(self, k):
+        """Returns the running sums of the PMF from 0 to at least k."""
+        table = getattr(self, '_cdf', None)
+        if table is not None and table[0] == self.lambtha and \
+                table[1].size > k:
+            return table[1]
+
+        size = k + 1
+        if table is not None and table[0] == self.lambtha:
+            size = min(max(size, 2 * table[1].size), self._cdf_limit() + 1)
+        cumulative = np.cumsum(np.exp(self._log_pmf(np.arange(size))))
+        self._cdf = (self.lambtha, cumulative)
+        return cumulative
+
+    def _cdf_limit(self):
+        """Returns the largest k whose CDF is kept in the table."""
+        lambtha = self.lambtha
+        return int(math.ceil(lambtha + 40 * math.sqrt(lambtha) + 40))
+
+    def _log_pmf(self, k):
+        """Computes the log of the PMF for integers k >= 0."""
+        # Poisson PMF formula: (λ^k * e^(-λ)) / k!
+        k = np.asarray(k, dtype=np.int64)
+        return k * math.log(self.lambtha) - self.lambtha - log_factorial(k)
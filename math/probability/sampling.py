@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+This module contains the random number generator helpers used by the
+sample methods of the distribution classes.
+
+Every sample method takes an rng argument that may be None (fresh OS
+entropy), an int seed, a numpy.random.SeedSequence or a
+numpy.random.Generator. To draw in parallel, give each worker one of the
+generators returned by spawn: they are statistically independent, and the
+same seed always gives the same streams whatever the number of processes
+or the order in which they run.
+"""
+import numpy as np
+
+
+def as_generator(rng=None):
+    """
+    Converts rng into a numpy.random.Generator.
+
+    Args:
+        rng: None, an int seed, a numpy.random.SeedSequence or a
+            numpy.random.Generator, which is returned unchanged.
+
+    Returns:
+        numpy.random.Generator: The generator to draw from.
+    """
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng)
+
+
+def spawn(seed, n):
+    """
+    Creates n independent generators from one seed, e.g. one for each
+    worker of a process pool.
+
+    Args:
+        seed: None, an int seed or a numpy.random.SeedSequence.
+        n (int): Number of generators.
+
+    Returns:
+        list of numpy.random.Generator: The generators, which are
+        picklable.
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return [np.random.default_rng(child) for child in seed.spawn(n)]
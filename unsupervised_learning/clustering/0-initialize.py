@@ -6,8 +6,15 @@ Defines function that initializes cluster centroids for K-means
 
 import numpy as np
 
+# distances held in memory at once when seeding, i.e. 32 MiB of float64
+CHUNK_ELEMENTS = 1 << 22
 
-def initialize(X, k):
+# k-means|| sampling rounds, and points sampled per round per cluster
+PARALLEL_ROUNDS = 5
+OVERSAMPLING = 2
+
+
+def initialize(X, k, init='uniform', rng=None):
     """
     Initializes cluster centroids for K-means
 
@@ -18,14 +25,26 @@ def initialize(X, k):
             d: the number of dimensions for each data point
         k [positive int]:
             contains the number of clusters
+        init [str or numpy.ndarray of shape (k, d)]:
+            'uniform', 'k-means++', 'k-means||', or the centroids to start
+            from, which are returned as a copy
+        rng [None, int seed or numpy.random.Generator]:
+            source of randomness; None uses the global numpy.random state
 
-    cluster centroids initialized with a multivariate uniform distribution
-        along each dimension in d:
+    'uniform': cluster centroids initialized with a multivariate uniform
+        distribution along each dimension in d:
         - minimum values for distribution should be the min values of X
             along each dimension in d
         - maximum values for distribution should be the max values of X
             along each dimension in d
         - should only use numpy.random.uniform exactly once
+    'k-means++': centroids drawn from X one at a time, each data point
+        being drawn with a probability proportional to its squared
+        distance D^2 to the closest centroid drawn so far
+    'k-means||': the scalable variant of k-means++, which oversamples
+        about OVERSAMPLING * k data points at once in each of
+        PARALLEL_ROUNDS rounds, then draws the k centroids among them by
+        k-means++, each weighted by the number of data points closest to it
 
     returns:
         [numpy.ndarray of shape (k, d)]:
@@ -33,15 +52,121 @@ def initialize(X, k):
         or None on failure
     """
     # type checks to catch failure
-    if type(X) is not np.ndarray or len(X.shape) != 2:
+    if not isinstance(X, np.ndarray) or len(X.shape) != 2:
         return None
     if type(k) is not int or k <= 0:
         return None
     n, d = X.shape
+    if isinstance(init, np.ndarray):
+        if init.shape != (k, d):
+            return None
+        return init.astype(float)
+    if init not in ('uniform', 'k-means++', 'k-means||'):
+        return None
+    rng = random_state(rng)
+    if init == 'k-means++':
+        return _plus_plus(X, k, rng)
+    if init == 'k-means||':
+        return _parallel(X, k, rng)
     # min values of X along each dimension in d
     low = np.min(X, axis=0)
     # max values of X along each dimension in d
     high = np.max(X, axis=0)
     # initialize cluster centroids with multivariate uniform distribution
-    centroids = np.random.uniform(low, high, size=(k, d))
+    centroids = rng.uniform(low, high, size=(k, d))
     return centroids
+
+
+def random_state(rng=None):
+    """
+    Returns the source of randomness for rng
+
+    parameters:
+        rng [None, int seed, numpy.random.Generator or RandomState]
+
+    returns:
+        the numpy.random module for None, so that numpy.random.seed keeps
+        the results reproducible, rng itself for a Generator or a
+        RandomState, or a new Generator seeded with rng
+    """
+    if rng is None or rng is np.random:
+        return np.random
+    if isinstance(rng, (np.random.Generator, np.random.RandomState)):
+        return rng
+    return np.random.default_rng(rng)
+
+
+def _plus_plus(X, k, rng, weights=None):
+    """
+    Draws k centroids from X by k-means++ (D^2 sampling), the data points
+    being optionally weighted
+    """
+    n = X.shape[0]
+    if weights is None:
+        weights = np.ones(n)
+    x_norms = np.einsum('ij,ij->i', X, X)
+    index = np.empty(k, dtype=np.intp)
+    index[0] = _draw(weights, rng)
+    d2 = _sq_distances(X, x_norms, X[index[:1]])
+    for i in range(1, k):
+        p = d2 * weights
+        # every data point is already a centroid: draw any of them
+        index[i] = _draw(p if p.sum() > 0 else weights, rng)
+        d2 = np.minimum(d2, _sq_distances(X, x_norms, X[index[i:i + 1]]))
+    return X[index].astype(float)
+
+
+def _parallel(X, k, rng):
+    """
+    Draws k centroids from X by k-means||
+    """
+    n = X.shape[0]
+    x_norms = np.einsum('ij,ij->i', X, X)
+    index = [np.array([_draw(np.ones(n), rng)])]
+    d2 = _sq_distances(X, x_norms, X[index[0]])
+    for _ in range(PARALLEL_ROUNDS):
+        psi = d2.sum()
+        if psi <= 0:
+            break
+        # every data point is drawn independently, in a single pass
+        drawn = np.flatnonzero(rng.random(n) < OVERSAMPLING * k * d2 / psi)
+        if drawn.size:
+            index.append(drawn)
+            d2 = np.minimum(d2, _sq_distances(X, x_norms, X[drawn]))
+
+    candidates = X[np.concatenate(index)]
+    if len(candidates) <= k:
+        return _plus_plus(X, k, rng)
+    closest = _sq_distances(X, x_norms, candidates, closest=True)
+    weights = np.bincount(closest, minlength=len(candidates))
+    return _plus_plus(candidates, k, rng, weights.astype(float))
+
+
+def _draw(p, rng):
+    """
+    Draws an index with probability proportional to the weights p
+    """
+    cumulative = np.cumsum(p)
+    i = np.searchsorted(cumulative, rng.random() * cumulative[-1],
+                        side='right')
+    return min(i, len(p) - 1)
+
+
+def _sq_distances(X, x_norms, C, closest=False):
+    """
+    Computes the squared distance of each data point to the closest of the
+    centroids C, or the index of that centroid if closest is True, as
+    ||x||^2 - 2 x.c + ||c||^2 in blocks of rows
+    """
+    n = X.shape[0]
+    chunk = max(1, CHUNK_ELEMENTS // len(C))
+    c_norms = np.einsum('ij,ij->i', C, C)
+    out = np.empty(n, dtype=np.intp if closest else float)
+    for start in range(0, n, chunk):
+        d2 = c_norms - 2 * np.dot(X[start:start + chunk], C.T)
+        if closest:
+            out[start:start + chunk] = np.argmin(d2, axis=1)
+        else:
+            out[start:start + chunk] = np.maximum(
+                d2.min(axis=1) + x_norms[start:start + chunk], 0)
+    return out
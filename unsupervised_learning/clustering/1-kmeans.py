@@ -2,11 +2,29 @@
 # -*- coding: utf-8 -*-
 """
 k-means.py file
+
+Besides Lloyd's algorithm, kmeans can run the assignment step of Elkan
+(2003) or Hamerly (2010): both keep, for each data point, an upper bound on
+the distance to its centroid and lower bounds on the distances to the
+other centroids, move the bounds by how far the centroids moved, and only
+compute the distances that the triangle inequality cannot rule out.
+Hamerly keeps one lower bound per data point (O(n) memory), Elkan one per
+data point and centroid (O(nk) memory, fewer distances computed).
+
+The bounds are widened by the rounding error of the distances, and any
+data point whose two closest centroids are within that error of each
+other is assigned from the very block of distances Lloyd's algorithm
+computes, so that all three algorithms give bitwise identical results.
 """
 import numpy as np
+seeding = __import__('0-initialize')
+
+# distances held in memory at once by assign, i.e. 32 MiB of float64
+CHUNK_ELEMENTS = 1 << 22
 
 
-def kmeans(X, k, iterations=1000):
+def kmeans(X, k, iterations=1000, init='uniform', rng=None,
+           algorithm='lloyd', stats=None):
     """
     Function that performs K-means on a dataset
 
@@ -17,6 +35,15 @@ def kmeans(X, k, iterations=1000):
      - k is a positive integer containing the number of clusters
      - iterations is a positive integer containing the maximum number of
         iterations that should be performed
+     - init is the seeding of the centroids, 'uniform', 'k-means++' or
+        'k-means||' (see 0-initialize.py)
+     - rng is None, an int seed or a numpy.random.Generator, used to seed
+        the centroids and to respawn empty clusters; None uses the global
+        numpy.random state
+     - algorithm is 'lloyd', 'elkan' or 'hamerly'
+     - stats is None or a dict, in which the numbers of distances between
+        data points and centroids computed and skipped are accumulated
+        under the keys 'distances' and 'skipped'
 
     Returns:
      C, clss, or None, None on failure
@@ -35,36 +62,407 @@ def kmeans(X, k, iterations=1000):
     if type(iterations) != int or iterations <= 0:
         return None, None
 
-    n, d = X.shape
+    if algorithm not in ('lloyd', 'elkan', 'hamerly'):
+        return None, None
+
+    rng = seeding.random_state(rng)
+    C = seeding.initialize(X, k, init, rng)
+    if C is None:
+        return None, None
+
+    C, clss, _ = refine(X, C, iterations, rng, algorithm, stats)
+    return C, clss
+
+
+def refine(X, C, iterations=1000, rng=None, algorithm='lloyd', stats=None):
+    """
+    Function that performs K-means on a dataset from initial centroids
 
-    minimum = np.amin(X, axis=0)
-    maximum = np.amax(X, axis=0)
+    Arguments:
+     - X is a numpy.ndarray of shape (n, d) containing the dataset
+     - C is a numpy.ndarray of shape (k, d) containing the initial
+        centroids
+     - iterations, algorithm and stats are as for kmeans
+     - rng is the source of randomness returned by random_state in
+        0-initialize.py, used to respawn empty clusters
 
-    # C = np.random.uniform(minimum, maximum, (k, d))
-    C = initialize(X, k)
+    Returns:
+     C, clss, var
+         - C and clss are as for kmeans
+         - var is the total intra-cluster variance, as variance in
+            2-variance.py computes it, from the final assignment
+    """
+    k = C.shape[0]
+    if algorithm == 'lloyd':
+        bounds = _Lloyd(X, k, stats)
+    elif algorithm == 'elkan':
+        bounds = _Elkan(X, k, stats)
+    else:
+        bounds = _Hamerly(X, k, stats)
     clss = None
     for i in range(iterations):
         C_cpy = np.copy(C)
-        distance = np.linalg.norm(X[:, None] - C, axis=-1)
-        clss = np.argmin(distance, axis=-1)
+        clss = bounds.assign(C)
         # move the centroids
-        for j in range(k):
-            index = np.argwhere(clss == j)
-            if not len(index):
-                C[j] = initialize(X, 1)
-            else:
-                C[j] = np.mean(X[index], axis=0)
+        C = centroids(X, clss, k)
+        empty = np.isnan(C[:, 0])
+        if empty.any():
+            C[empty] = initialize(X, int(empty.sum()), rng)
 
         if (C_cpy == C).all():
-            return C, clss
+            break
+    else:
+        clss = bounds.assign(C)
 
-    distance = np.linalg.norm(X[:, None] - C, axis=-1)
-    clss = np.argmin(distance, axis=-1)
+    dist = _distances(X, np.arange(X.shape[0]), C, clss)
+    return C, clss, np.dot(dist, dist)
+
+
+def assign(X, C, distances=False):
+    """
+    Function that assigns each data point to its closest centroid
+
+    The squared distances are expanded as ||x||^2 - 2 x.c + ||c||^2, so each
+    block of CHUNK_ELEMENTS // k rows costs one matrix product, and only a
+    block of the (n, k) distance matrix is held in memory at a time.
+
+    Arguments:
+     - X is a numpy.ndarray of shape (n, d) containing the dataset
+     - C is a numpy.ndarray of shape (k, d) containing the centroids
+     - distances is a boolean, True to also return the squared distance of
+        each data point to its centroid
+
+    Returns:
+     clss, or clss, dist if distances is True
+         - clss is a numpy.ndarray of shape (n,) containing the index of the
+            closest centroid to each data point
+         - dist is a numpy.ndarray of shape (n,) containing the squared
+            distances to those centroids
+    """
+    n = X.shape[0]
+    k = C.shape[0]
+    chunk = max(1, CHUNK_ELEMENTS // k)
+    clss = np.empty(n, dtype=np.intp)
+    dist = np.empty(n) if distances else None
+    for start, block, d2 in _blocks(X, C):
+        clss[start:start + chunk] = np.argmin(d2, axis=1)
+        if distances:
+            closest = d2[np.arange(len(block)), clss[start:start + chunk]]
+            # clip the rounding errors of the expansion below zero
+            dist[start:start + chunk] = np.maximum(
+                closest + np.einsum('ij,ij->i', block, block), 0)
+
+    if distances:
+        return clss, dist
+    return clss
+
+
+def _blocks(X, C, starts=None):
+    """
+    Function that yields start, block, d2 for the blocks of rows of X
+    starting at starts (by default all of them), where d2 is the squared
+    distance of each row of the block to each centroid, minus ||x||^2
+    """
+    chunk = max(1, CHUNK_ELEMENTS // C.shape[0])
+    # ||x||^2 does not change which centroid is the closest
+    c_norms = np.einsum('ij,ij->i', C, C)
+    if starts is None:
+        starts = range(0, X.shape[0], chunk)
+    for start in starts:
+        block = X[start:start + chunk]
+        yield start, block, c_norms - 2 * np.dot(block, C.T)
+
+
+def _lloyd_rows(X, C, rows):
+    """
+    Function that assigns the data points of index rows exactly as assign
+    does, by recomputing the blocks of rows that contain them
+    """
+    chunk = max(1, CHUNK_ELEMENTS // C.shape[0])
+    starts = np.unique(rows // chunk) * chunk
+    clss = np.empty(len(rows), dtype=np.intp)
+    for start, block, d2 in _blocks(X, C, starts):
+        inside = (rows >= start) & (rows < start + chunk)
+        clss[inside] = np.argmin(d2[rows[inside] - start], axis=1)
+    return clss
+
+
+def _distances(X, rows, C, cols):
+    """
+    Function that computes the distances between the data points of index
+    rows and the centroids of index cols, pair by pair
+    """
+    dist = np.empty(len(rows))
+    chunk = max(1, CHUNK_ELEMENTS // X.shape[1])
+    for start in range(0, len(rows), chunk):
+        diff = X[rows[start:start + chunk]] - C[cols[start:start + chunk]]
+        dist[start:start + chunk] = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+    return dist
+
+
+def _gaps(C):
+    """
+    Function that computes the distances between the centroids, with inf
+    on the diagonal
+    """
+    c_norms = np.einsum('ij,ij->i', C, C)
+    d2 = c_norms[:, np.newaxis] + c_norms - 2 * np.dot(C, C.T)
+    gaps = np.sqrt(np.maximum(d2, 0))
+    np.fill_diagonal(gaps, np.inf)
+    return gaps
 
-    return C, clss
 
+class _Lloyd:
+    """
+    Class that assigns the data points with Lloyd's algorithm, computing
+    every distance
+    """
+
+    def __init__(self, X, k, stats=None):
+        """
+        Class constructor
+        """
+        self.X = X
+        self.k = k
+        self.stats = stats
+
+    def assign(self, C):
+        """
+        Function that assigns each data point to its closest centroid
+        """
+        self._count(self.X.shape[0] * self.k)
+        return assign(self.X, C)
+
+    def _count(self, computed):
+        """
+        Function that accumulates the numbers of distances computed and
+        skipped in an assignment
+        """
+        if self.stats is not None:
+            total = self.X.shape[0] * self.k
+            self.stats['distances'] = self.stats.get('distances', 0) + \
+                int(computed)
+            self.stats['skipped'] = self.stats.get('skipped', 0) + \
+                int(total - computed)
+
+
+class _Hamerly(_Lloyd):
+    """
+    Class that assigns the data points with Hamerly's algorithm
+
+    Attributes (besides X, k and stats):
+     - C is the centroids of the previous assignment, or None
+     - clss is the index of the centroid of each data point
+     - upper is an upper bound on the distance of each data point to its
+        centroid
+     - lower is a lower bound on the distance of each data point to every
+        other centroid
+    """
+
+    def __init__(self, X, k, stats=None):
+        """
+        Class constructor
+        """
+        super().__init__(X, k, stats)
+        self.C = None
+        self.x_norms = np.einsum('ij,ij->i', X, X)
+        # relative rounding error of a squared distance expanded as
+        # ||x||^2 - 2 x.c + ||c||^2
+        self.gamma = 2 * (X.shape[1] + 2) * np.finfo(float).eps
+        self.c_max = 0.
+
+    def assign(self, C):
+        """
+        Function that assigns each data point to its closest centroid
+        """
+        c_norms = np.einsum('ij,ij->i', C, C)
+        self.c_max = max(self.c_max, c_norms.max())
+        # bound on the rounding error of each squared distance
+        error = self.gamma * (self.x_norms + self.c_max)
+        if self.C is None:
+            self._start(C)
+            self._count(self.X.shape[0] * self.k)
+        else:
+            shift = np.sqrt(np.einsum('ij,ij->i', C - self.C, C - self.C))
+            self._count(self._update(C, shift, error))
+        self.C = np.copy(C)
+        return np.copy(self.clss)
+
+    def _start(self, C):
+        """
+        Function that assigns every data point as assign does, and sets
+        the bounds to the distances
+        """
+        n = self.X.shape[0]
+        chunk = max(1, CHUNK_ELEMENTS // self.k)
+        self.clss = np.empty(n, dtype=np.intp)
+        self.upper = np.empty(n)
+        self.lower = self._lower_bounds(n)
+        for start, block, d2 in _blocks(self.X, C):
+            rows = np.arange(start, start + len(block))
+            self.clss[rows] = np.argmin(d2, axis=1)
+            self._tighten(rows, d2, self.clss[rows])
+
+    def _lower_bounds(self, n):
+        """
+        Function that allocates the lower bounds of n data points
+        """
+        return np.full(n, np.inf)
+
+    def _tighten(self, rows, d2, clss):
+        """
+        Function that sets the bounds of the data points of index rows,
+        assigned to clss, from their squared distances d2 minus ||x||^2
+        """
+        d2 = d2 + self.x_norms[rows, np.newaxis]
+        np.maximum(d2, 0, out=d2)
+        self.upper[rows] = np.sqrt(d2[np.arange(len(rows)), clss])
+        if self.k > 1:
+            d2[np.arange(len(rows)), clss] = np.inf
+            self.lower[rows] = np.sqrt(d2.min(axis=1))
+
+    def _update(self, C, shift, error):
+        """
+        Function that moves the bounds by the centroid shifts and computes
+        the distances they cannot rule out
+
+        Returns:
+         the number of distances computed
+        """
+        self.upper += shift[self.clss]
+        if self.k > 1:
+            top = np.argmax(shift)
+            second = np.max(np.delete(shift, top))
+            self.lower -= np.where(self.clss == top, second, shift[top])
+        # the distances are exact up to the square root of error
+        slack = 3 * np.sqrt(error)
+        half = _gaps(C).min(axis=1) / 2
+        bound = np.maximum(self.lower, half[self.clss])
+        rows = np.flatnonzero(self.upper + slack >= bound)
+        self.upper[rows] = _distances(self.X, rows, C, self.clss[rows])
+        computed = len(rows)
+        rows = rows[self.upper[rows] + slack[rows] >= bound[rows]]
+        computed += len(rows) * self.k
+        self._reassign(C, rows, error)
+        return computed
+
+    def _reassign(self, C, rows, error):
+        """
+        Function that computes every distance of the data points of index
+        rows, and reassigns them exactly as assign does
+        """
+        chunk = max(1, CHUNK_ELEMENTS // self.k)
+        c_norms = np.einsum('ij,ij->i', C, C)
+        for start in range(0, len(rows), chunk):
+            sub = rows[start:start + chunk]
+            d2 = c_norms - 2 * np.dot(self.X[sub], C.T)
+            clss = np.argmin(d2, axis=1)
+            if self.k > 1:
+                # a near tie depends on the rounding of the block
+                closest = np.partition(d2, 1, axis=1)
+                tie = closest[:, 1] - closest[:, 0] <= 2 * error[sub]
+                if tie.any():
+                    clss[tie] = _lloyd_rows(self.X, C, sub[tie])
+            self.clss[sub] = clss
+            self._tighten(sub, d2, clss)
+
+
+class _Elkan(_Hamerly):
+    """
+    Class that assigns the data points with Elkan's algorithm
+
+    Attributes (besides those of _Hamerly):
+     - lower is a numpy.ndarray of shape (n, k) containing a lower bound on
+        the distance of each data point to each centroid
+    """
+
+    def _lower_bounds(self, n):
+        """
+        Function that allocates the lower bounds of n data points
+        """
+        return np.empty((n, self.k))
+
+    def _tighten(self, rows, d2, clss):
+        """
+        Function that sets the bounds of the data points of index rows,
+        assigned to clss, from their squared distances d2 minus ||x||^2
+        """
+        d2 = d2 + self.x_norms[rows, np.newaxis]
+        lower = np.sqrt(np.maximum(d2, 0))
+        self.lower[rows] = lower
+        self.upper[rows] = lower[np.arange(len(rows)), clss]
+
+    def _update(self, C, shift, error):
+        """
+        Function that moves the bounds by the centroid shifts and computes
+        the distances they cannot rule out
+
+        Returns:
+         the number of distances computed
+        """
+        self.upper += shift[self.clss]
+        self.lower -= shift
+        slack = 3 * np.sqrt(error)
+        gaps = _gaps(C)
+        half = gaps.min(axis=1) / 2
+        rows = np.flatnonzero(self.upper + slack >= half[self.clss])
+        self.upper[rows] = _distances(self.X, rows, C, self.clss[rows])
+        self.lower[rows, self.clss[rows]] = self.upper[rows]
+        computed = len(rows)
+
+        chunk = max(1, CHUNK_ELEMENTS // self.k)
+        ties = [rows[:0]]
+        for start in range(0, len(rows), chunk):
+            sub = rows[start:start + chunk]
+            clss = self.clss[sub]
+            upper = (self.upper[sub] + slack[sub])[:, np.newaxis]
+            lower = self.lower[sub]
+            check = (upper >= lower) & (2 * upper >= gaps[clss])
+            check[np.arange(len(sub)), clss] = False
+            i, j = np.nonzero(check)
+            lower[i, j] = _distances(self.X, sub[i], C, j)
+            computed += len(i)
+            self.lower[sub] = lower
+
+            # the centroids not checked are farther than upper + slack
+            dist = np.where(check, lower, np.inf)
+            dist[np.arange(len(sub)), clss] = self.upper[sub]
+            closest = np.partition(dist, 1, axis=1)
+            self.clss[sub] = np.argmin(dist, axis=1)
+            self.upper[sub] = closest[:, 0]
+            ties.append(sub[closest[:, 1] - closest[:, 0] <= slack[sub]])
+
+        # the data points with a near tie get every distance
+        rows = np.concatenate(ties)
+        computed += len(rows) * self.k
+        self._reassign(C, rows, error)
+        return computed
+
+
+def centroids(X, clss, k):
+    """
+    Function that computes the mean of the data points of each cluster in
+    a single pass over the dataset
 
-def initialize(X, k):
+    Arguments:
+     - X is a numpy.ndarray of shape (n, d) containing the dataset
+     - clss is a numpy.ndarray of shape (n,) containing the cluster index of
+        each data point
+     - k is a positive integer containing the number of clusters
+
+    Returns:
+     A numpy.ndarray of shape (k, d) containing the centroid means, with
+     rows of NaN for the empty clusters
+    """
+    counts = np.bincount(clss, minlength=k)
+    sums = np.empty((k, X.shape[1]))
+    for j in range(X.shape[1]):
+        sums[:, j] = np.bincount(clss, weights=X[:, j], minlength=k)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts[:, np.newaxis]
+
+
+def initialize(X, k, rng=None):
     """
     Function that initializes cluster centroids for K-means
 
@@ -74,17 +472,11 @@ def initialize(X, k):
         * n is the number of data points
         * d is the number of dimensions for each data point
      - k is a positive integer containing the number of clusters
+     - rng is None, an int seed or a numpy.random.Generator
 
     Returns:
      A numpy.ndarray of shape (k, d) containing the initialized centroids
      for each cluster, or None on failure
     """
 
-    n, d = X.shape
-
-    minimum = np.amin(X, axis=0)
-    maximum = np.amax(X, axis=0)
-
-    values = np.random.uniform(minimum, maximum, (k, d))
-
-    return values
+    return seeding.initialize(X, k, 'uniform', rng)
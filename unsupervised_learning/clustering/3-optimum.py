@@ -4,11 +4,11 @@
 optimum.py file
 """
 import numpy as np
-kmeans = __import__('1-kmeans').kmeans
-variance = __import__('2-variance').variance
+kmeans_sweep = __import__('sweep').kmeans_sweep
 
 
-def optimum_k(X, kmin=1, kmax=None, iterations=1000):
+def optimum_k(X, kmin=1, kmax=None, iterations=1000, workers=None,
+              warm_start=False, rng=None):
     """
     Function that tests for the optimum number of clusters by variance
 
@@ -20,6 +20,13 @@ def optimum_k(X, kmin=1, kmax=None, iterations=1000):
         to check for (inclusive)
      - iterations is a positive integer containing the maximum number of
         iterations for K-means
+     - workers is the number of worker processes sharing the cluster sizes;
+        None performs K-means for each of them in turn in this process
+     - warm_start is a boolean, True to start K-means for each cluster size
+        from the result for the previous one, with its cluster of highest
+        variance split in two
+     - rng is None, an int seed or a numpy.random.Generator; None in this
+        process uses the global numpy.random state
 
     Returns:
      results, d_vars, or None, None on failure
@@ -50,12 +57,12 @@ def optimum_k(X, kmin=1, kmax=None, iterations=1000):
     results = []
     d_vars = []
 
-    for k in range(kmin, kmax + 1):
-        C, clss = kmeans(X, k, iterations)
+    # the variance of each fit is computed with its final assignment
+    fits = kmeans_sweep(X, range(kmin, kmax + 1), iterations, workers,
+                        warm_start, rng)
+    var_min = fits[0][2]
+    for C, clss, var in fits:
         results.append((C, clss))
-        if k == kmin:
-            var_min = variance(X, C)
-
-        d_vars.append(var_min - variance(X, C))
+        d_vars.append(var_min - var)
 
     return results, d_vars
@@ -7,13 +7,15 @@ import numpy as np
 kmeans = __import__('1-kmeans').kmeans
 
 
-def initialize(X, k):
+def initialize(X, k, rng=None):
     """
     Function  that initializes variables for a Gaussian Mixture Model
 
     Arguments:
      - X is a numpy.ndarray of shape (n, d) containing the data set
      - k is a positive integer containing the number of clusters
+     - rng is None, an int seed or a numpy.random.Generator, used by
+        K-means; None uses the global numpy.random state
 
     Returns:
      pi, m, S, or None, None, None on failure
@@ -33,7 +35,7 @@ def initialize(X, k):
 
     n, d = X.shape
     pi = np.tile(1/k, (k,))
-    m, _ = kmeans(X, k)
+    m, _ = kmeans(X, k, rng=rng)
     S = np.tile(np.identity(d), (k, 1, 1))
 
     return pi, m, S
@@ -9,7 +9,8 @@ expectation = __import__('6-expectation').expectation
 maximization = __import__('7-maximization').maximization
 
 
-def expectation_maximization(X, k, iterations=1000, tol=1e-5, verbose=False):
+def expectation_maximization(X, k, iterations=1000, tol=1e-5, verbose=False,
+                             init=None):
     """
     Function that performs the expectation maximization for a GMM:
 
@@ -23,6 +24,8 @@ def expectation_maximization(X, k, iterations=1000, tol=1e-5, verbose=False):
         or equal to tol you should stop the algorithm
      - verbose is a boolean that determines if you should print information
         about the algorithm
+     - init is None, or a tuple pi, m, S of the parameters to start from,
+        instead of initializing them with K-means
 
     Returns:
      pi, m, S, g, l, or None, None, None, None, None on failure
@@ -48,7 +51,10 @@ def expectation_maximization(X, k, iterations=1000, tol=1e-5, verbose=False):
     if type(verbose) != bool:
         return None, None, None, None, None
 
-    pi, m, S = initialize(X, k)
+    if init is None:
+        pi, m, S = initialize(X, k)
+    else:
+        pi, m, S = init
     prev_like = 0
     g, likelihood = expectation(X, pi, m, S)
 
@@ -4,10 +4,11 @@
 BIC.py file
 """
 import numpy as np
-expectation_maximization = __import__('8-EM').expectation_maximization
+em_sweep = __import__('sweep').em_sweep
 
 
-def BIC(X, kmin=1, kmax=None, iterations=1000, tol=1e-5, verbose=False):
+def BIC(X, kmin=1, kmax=None, iterations=1000, tol=1e-5, verbose=False,
+        workers=None, warm_start=False, rng=None):
     """
     Function that finds the best number of clusters for a GMM using
     the Bayesian Information Criterion
@@ -24,6 +25,14 @@ def BIC(X, kmin=1, kmax=None, iterations=1000, tol=1e-5, verbose=False):
         the EM algorithm
      - verbose is a boolean that determines if the EM algorithm should print
         information to the standard output
+     - workers is the number of worker processes sharing the cluster sizes;
+        None performs the EM algorithm for each of them in turn in this
+        process
+     - warm_start is a boolean, True to start the EM algorithm for each
+        cluster size from the result for the previous one, with its
+        component of highest variance split in two
+     - rng is None, an int seed or a numpy.random.Generator; None in this
+        process uses the global numpy.random state
 
     Returns:
      best_k, best_result, l, b, or None, None, None, None on failure
@@ -63,9 +72,9 @@ def BIC(X, kmin=1, kmax=None, iterations=1000, tol=1e-5, verbose=False):
     n, d = X.shape
     k_r, result, l_b, b = [], [], [], []
 
-    for k in range(kmin, kmax + 1):
-        pi, m, S, g, like = expectation_maximization(
-            X, k, iterations, tol, verbose)
+    fits = em_sweep(X, range(kmin, kmax + 1), iterations, tol, verbose,
+                    workers, warm_start, rng)
+    for k, (pi, m, S, like) in zip(range(kmin, kmax + 1), fits):
         k_r.append(k)
         result.append((pi, m, S))
         l_b.append(like)
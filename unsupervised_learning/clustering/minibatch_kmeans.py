@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+minibatch_kmeans.py file
+
+Mini-batch K-means (Sculley, 2010) for datasets that do not fit in memory
+or that arrive continuously: each mini-batch moves every centroid towards
+the mean of its points in the batch, by a per-centroid learning rate of
+(points of the batch) / (points seen so far by the centroid), so that each
+centroid stays the running mean of the points ever assigned to it.
+
+Centroids that catch almost no data points, e.g. seeded in an empty region
+or on a duplicate point, are moved onto data points of the current batch
+drawn with probability proportional to D^2, as kmeans respawns its empty
+clusters.
+"""
+import numpy as np
+seeding = __import__('0-initialize')
+kmeans = __import__('1-kmeans')
+
+
+class MiniBatchKMeans:
+    """
+    Class that performs mini-batch K-means on a stream of data
+
+    Attributes:
+     - k is the number of clusters
+     - batch_size is the number of data points of each mini-batch
+     - init is the seeding of the centroids on the first mini-batch,
+        'uniform', 'k-means++' or 'k-means||'
+     - smoothing is the weight of each mini-batch in the smoothed inertia
+     - tol is the mean squared centroid move, relative to the smoothed
+        inertia, below which a mini-batch counts as converged; 0 disables it
+     - patience is the number of consecutive mini-batches without a lower
+        smoothed inertia after which the fit has converged
+     - reassignment is the fraction of the largest centroid count below
+        which a centroid is moved onto a data point of the batch
+     - C is a numpy.ndarray of shape (k, d) containing the centroid means,
+        or None until k data points have been seen
+     - counts is a numpy.ndarray of shape (k,) containing the number of
+        data points each centroid has been updated with
+     - inertia is the exponentially weighted average of the mean squared
+        distance of the data points of each mini-batch to their centroid
+     - steps is the number of mini-batches seen
+     - converged is True once the smoothed inertia has stopped decreasing
+        or the centroids have stopped moving
+    """
+
+    def __init__(self, k, batch_size=1024, init='k-means++', rng=None,
+                 smoothing=0.1, tol=0., patience=10, reassignment=0.01):
+        """
+        Class constructor
+
+        Arguments:
+         - k is a positive integer containing the number of clusters
+         - batch_size is a positive integer containing the number of data
+            points of each mini-batch
+         - init is 'uniform', 'k-means++' or 'k-means||'
+         - rng is None, an int seed or a numpy.random.Generator
+         - smoothing is a float in (0, 1]
+         - tol is a non-negative float
+         - patience is a positive integer
+         - reassignment is a float in [0, 1), 0 disables the reassignment
+        """
+        if type(k) != int or k <= 0:
+            raise ValueError('k must be a positive integer')
+        if type(batch_size) != int or batch_size <= 0:
+            raise ValueError('batch_size must be a positive integer')
+        if init not in ('uniform', 'k-means++', 'k-means||'):
+            raise ValueError("init must be 'uniform', 'k-means++' or "
+                             "'k-means||'")
+        if not 0 < smoothing <= 1:
+            raise ValueError('smoothing must be in (0, 1]')
+        if not 0 <= reassignment < 1:
+            raise ValueError('reassignment must be in [0, 1)')
+        self.k = k
+        self.batch_size = batch_size
+        self.init = init
+        self.rng = seeding.random_state(rng)
+        self.smoothing = smoothing
+        self.tol = tol
+        self.patience = patience
+        self.reassignment = reassignment
+        self.C = None
+        self.counts = np.zeros(k, dtype=np.int64)
+        self.inertia = None
+        self.steps = 0
+        self.converged = False
+        self._best = np.inf
+        self._stale = 0
+        # data points held back until there are enough to seed k centroids
+        self._seed_points = []
+
+    def partial_fit(self, X):
+        """
+        Function that updates the centroids with a chunk of data
+
+        Arguments:
+         - X is a numpy.ndarray of shape (n, d), e.g. a numpy.memmap,
+            containing the chunk, read batch_size data points at a time
+
+        Returns:
+         self
+        """
+        if len(X.shape) != 2:
+            raise ValueError('X must be a 2D numpy.ndarray')
+        for start in range(0, X.shape[0], self.batch_size):
+            self._step(np.asarray(X[start:start + self.batch_size],
+                                  dtype=float))
+        return self
+
+    def fit(self, X, epochs=1):
+        """
+        Function that fits the centroids until convergence
+
+        Arguments:
+         - X is a numpy.ndarray of shape (n, d), e.g. a numpy.memmap, whose
+            mini-batches are visited in a random order in each epoch, or an
+            iterable of chunks of shape (n_i, d), e.g. a generator, which is
+            consumed once
+         - epochs is a positive integer containing the maximum number of
+            passes over an array
+
+        Returns:
+         self
+        """
+        if not hasattr(X, 'shape'):
+            for chunk in X:
+                self.partial_fit(chunk)
+                if self.converged:
+                    break
+            return self
+
+        starts = np.arange(0, X.shape[0], self.batch_size)
+        for _ in range(epochs):
+            for start in self.rng.permutation(starts):
+                self.partial_fit(X[start:start + self.batch_size])
+                if self.converged:
+                    return self
+        return self
+
+    def predict(self, X):
+        """
+        Function that finds the closest centroid to each data point
+
+        Arguments:
+         - X is a numpy.ndarray of shape (n, d), e.g. a numpy.memmap
+
+        Returns:
+         clss, a numpy.ndarray of shape (n,) containing the index of the
+         cluster in C that each data point belongs to
+        """
+        if self.C is None:
+            raise ValueError('the centroids have not been fitted')
+        return kmeans.assign(X, self.C)
+
+    def _step(self, batch):
+        """
+        Function that updates the centroids with one mini-batch
+        """
+        if batch.shape[0] == 0:
+            return
+        if self.C is None:
+            self._seed_points.append(batch)
+            if sum(len(b) for b in self._seed_points) < self.k:
+                return
+            batch = np.concatenate(self._seed_points)
+            self._seed_points = []
+            self.C = seeding.initialize(batch, self.k, self.init, self.rng)
+
+        clss, dist = kmeans.assign(batch, self.C, distances=True)
+        batch_counts = np.bincount(clss, minlength=self.k)
+        hit = batch_counts > 0
+        self.counts += batch_counts
+        # per-centroid learning rate
+        eta = batch_counts[hit] / self.counts[hit]
+        means = kmeans.centroids(batch, clss, self.k)[hit]
+        move = eta[:, np.newaxis] * (means - self.C[hit])
+        self.C[hit] += move
+        self.steps += 1
+        self._reassign(batch, dist)
+
+        batch_inertia = dist.mean()
+        if self.inertia is None:
+            self.inertia = batch_inertia
+        else:
+            self.inertia += self.smoothing * (batch_inertia - self.inertia)
+
+        if self.inertia < self._best:
+            self._best = self.inertia
+            self._stale = 0
+        else:
+            self._stale += 1
+        shift = np.einsum('ij,ij->', move, move) / self.k
+        if self._stale >= self.patience or \
+                self.tol > 0 and shift <= self.tol * self.inertia:
+            self.converged = True
+
+    def _reassign(self, batch, dist):
+        """
+        Function that moves the centroids whose count is below reassignment
+        times the largest count onto data points of the batch, drawn with
+        probability proportional to their squared distance to the centroids
+        """
+        low = self.counts < self.reassignment * self.counts.max()
+        far = np.flatnonzero(dist > 0)
+        size = min(int(low.sum()), len(far))
+        if size == 0:
+            return
+        low = np.flatnonzero(low)[:size]
+        drawn = self.rng.choice(far, size, replace=False,
+                                p=dist[far] / dist[far].sum())
+        self.C[low] = batch[drawn]
+        # as much weight as the lightest kept centroid, so that a moved
+        # centroid is not pulled straight back by its first few points
+        self.counts[low] = np.delete(self.counts, low).min()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+sweep.py file
+
+Fits K-means or a GMM for each number of clusters of a range, in a pool of
+worker processes that are handed the data set once, by the pool
+initializer, instead of receiving a pickled copy of it with every task:
+forked workers inherit it without any copy.
+
+Each cluster count gets its own random stream, spawned from one seed, so
+that the cold-started fits do not depend on the number of workers. With
+warm_start, the range is cut into one contiguous segment per worker, and
+within a segment the fit of k clusters starts from the previous fit of
+fewer clusters, whose cluster of highest variance is split in two along its
+principal axis until there are k of them.
+"""
+import multiprocessing
+import os
+import numpy as np
+seeding = __import__('0-initialize')
+kmeans = __import__('1-kmeans')
+gmm_initialize = __import__('4-initialize').initialize
+expectation_maximization = __import__('8-EM').expectation_maximization
+
+try:
+    import threadpoolctl
+except ImportError:
+    threadpoolctl = None
+
+
+# power iterations for the principal axis of the cluster being split
+SPLIT_ITERATIONS = 20
+
+# the data set of a worker process, set by _init_worker
+_worker = {}
+
+
+def kmeans_sweep(X, ks, iterations=1000, workers=None, warm_start=False,
+                 rng=None, algorithm='lloyd'):
+    """
+    Function that performs K-means for each number of clusters in ks
+
+    Arguments:
+     - X is a numpy.ndarray of shape (n, d), or a numpy.memmap, containing
+        the data set
+     - ks is a range of positive integers containing the numbers of
+        clusters
+     - iterations is a positive integer containing the maximum number of
+        iterations for K-means
+     - workers is the number of worker processes; None fits in this process
+     - warm_start is a boolean, True to start each fit of a segment from
+        the previous one when it has fewer clusters
+     - rng is None, an int seed, a numpy.random.SeedSequence or a
+        numpy.random.Generator; None in this process uses the global
+        numpy.random state, as kmeans does
+     - algorithm is 'lloyd', 'elkan' or 'hamerly'
+
+    Returns:
+     a list containing C, clss, var for each number of clusters, where var
+     is the total intra-cluster variance computed with the fit
+    """
+    return _sweep(_kmeans_segment, X, ks, workers, warm_start, rng,
+                  (iterations, algorithm))
+
+
+def em_sweep(X, ks, iterations=1000, tol=1e-5, verbose=False, workers=None,
+             warm_start=False, rng=None):
+    """
+    Function that performs the expectation maximization for a GMM for each
+    number of clusters in ks
+
+    Arguments:
+     - X, ks, workers, warm_start and rng are as for kmeans_sweep
+     - iterations, tol and verbose are as for expectation_maximization
+
+    Returns:
+     a list containing pi, m, S, l for each number of clusters
+    """
+    return _sweep(_em_segment, X, ks, workers, warm_start, rng,
+                  (iterations, tol, verbose))
+
+
+def _sweep(segment, X, ks, workers, warm_start, rng, args):
+    """
+    Function that runs segment over the segments of ks, in this process or
+    in a pool of worker processes
+    """
+    ks = list(ks)
+    if workers is None or workers <= 1:
+        seeds = [None] * len(ks) if rng is None else _seeds(rng, len(ks))
+        return segment(X, ks, seeds, warm_start, *args)
+
+    workers = min(int(workers), len(ks))
+    seeds = _seeds(rng, len(ks))
+    if warm_start:
+        parts = np.array_split(np.arange(len(ks)), workers)
+    else:
+        parts = [[i] for i in range(len(ks))]
+    threads = max((os.cpu_count() or 1) // workers, 1)
+
+    # the largest numbers of clusters are the slowest: start them first
+    tasks = [(segment, [ks[i] for i in part], [seeds[i] for i in part],
+              warm_start, args)
+             for part in reversed(parts)]
+    context = multiprocessing.get_context()
+    with context.Pool(workers, initializer=_init_worker,
+                      initargs=(X, threads)) as pool:
+        results = pool.starmap(_run_segment, tasks, chunksize=1)
+
+    return [fit for part in reversed(results) for fit in part]
+
+
+def _seeds(rng, n):
+    """
+    Function that spawns n independent random streams from rng
+    """
+    if isinstance(rng, np.random.Generator):
+        return rng.spawn(n)
+    if not isinstance(rng, np.random.SeedSequence):
+        rng = np.random.SeedSequence(rng)
+    return rng.spawn(n)
+
+
+def _kmeans_segment(X, ks, seeds, warm_start, iterations, algorithm):
+    """
+    Function that performs K-means for each number of clusters of a segment
+    """
+    fits = []
+    for k, seed in zip(ks, seeds):
+        rng = seeding.random_state(seed)
+        if warm_start and fits and len(fits[-1][0]) < k:
+            C, clss = fits[-1][:2]
+            while True:
+                C = _split_kmeans(X, C, clss)
+                if len(C) == k:
+                    break
+                clss = kmeans.assign(X, C)
+        else:
+            C = seeding.initialize(X, k, 'uniform', rng)
+        fits.append(kmeans.refine(X, C, iterations, rng, algorithm))
+    return fits
+
+
+def _em_segment(X, ks, seeds, warm_start, iterations, tol, verbose):
+    """
+    Function that performs the expectation maximization for each number of
+    clusters of a segment
+    """
+    # expectation only accepts a plain numpy.ndarray: view a memmap as one
+    X = np.asarray(X)
+    fits = []
+    for k, seed in zip(ks, seeds):
+        if warm_start and fits and len(fits[-1][0]) < k:
+            init = fits[-1][:3]
+            while len(init[0]) < k:
+                init = _split_gmm(*init)
+        elif seed is not None:
+            init = gmm_initialize(X, k, seed)
+        else:
+            init = None
+        pi, m, S, _, like = expectation_maximization(
+            X, k, iterations, tol, verbose, init)
+        # the responsibilities g are not sent back
+        fits.append((pi, m, S, like))
+    return fits
+
+
+def _split_kmeans(X, C, clss):
+    """
+    Function that splits the cluster with the largest sum of squared
+    distances to its centroid in two, along its principal axis
+
+    Returns:
+     a numpy.ndarray of shape (k + 1, d) containing the centroids
+    """
+    dist = kmeans._distances(X, np.arange(X.shape[0]), C, clss)
+    j = np.argmax(np.bincount(clss, weights=dist * dist,
+                              minlength=C.shape[0]))
+    points = X[clss == j] - C[j]
+    # power iterations, from the direction of the farthest point
+    v = points[np.argmax(dist[clss == j])]
+    for _ in range(SPLIT_ITERATIONS):
+        norm = np.linalg.norm(v)
+        if norm == 0:
+            break
+        v = np.dot(points.T, np.dot(points, v / norm))
+    norm = np.linalg.norm(v)
+    if norm == 0:
+        return np.concatenate((C, C[j:j + 1]))
+    v /= norm
+    # the means of the halves of a normal cluster are +/- sqrt(2 / pi) std
+    offset = np.sqrt(2 / np.pi) * np.std(np.dot(points, v)) * v
+    return np.concatenate((C[:j], [C[j] - offset, C[j] + offset], C[j + 1:]))
+
+
+def _split_gmm(pi, m, S):
+    """
+    Function that splits the component with the largest weighted variance
+    in two, along its principal axis
+
+    Returns:
+     pi, m, S for one more component
+    """
+    j = np.argmax(pi * np.trace(S, axis1=1, axis2=2))
+    values, vectors = np.linalg.eigh(S[j])
+    offset = np.sqrt(2 / np.pi * max(values[-1], 0)) * vectors[:, -1]
+    pi = np.concatenate((pi[:j], [pi[j] / 2, pi[j] / 2], pi[j + 1:]))
+    m = np.concatenate((m[:j], [m[j] - offset, m[j] + offset], m[j + 1:]))
+    S = np.concatenate((S[:j], [S[j], S[j]], S[j + 1:]))
+    return pi, m, S
+
+
+def _init_worker(X, threads):
+    """
+    Function that keeps the data set of a worker process, and limits its
+    BLAS threads when threadpoolctl is available
+    """
+    _worker['X'] = X
+    if threadpoolctl is not None:
+        threadpoolctl.threadpool_limits(threads)
+
+
+def _run_segment(segment, ks, seeds, warm_start, args):
+    """
+    Function that runs segment inside a worker process
+    """
+    return segment(_worker['X'], ks, seeds, warm_start, *args)